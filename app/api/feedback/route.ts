@@ -1,4 +1,5 @@
 import { NextRequest, NextResponse } from "next/server";
+import { sessionHeaders } from "@/lib/session";
 
 const FEEDBACK_API_URL = process.env.FEEDBACK_API_URL || "http://127.0.0.1:8000/feedback";
 
@@ -43,9 +44,10 @@ export async function POST(request: NextRequest) {
     const backendFormData = new FormData();
     backendFormData.append("audio", audioFile);
 
-    // Forward to backend
+    // Forward to backend (session ID is used for fair scheduling)
     const response = await fetch(FEEDBACK_API_URL, {
       method: "POST",
+      headers: sessionHeaders(request),
       body: backendFormData,
     });
 
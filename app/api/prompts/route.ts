@@ -1,4 +1,5 @@
-import { NextResponse } from "next/server";
+import { NextRequest, NextResponse } from "next/server";
+import { sessionHeaders } from "@/lib/session";
 
 const BACKEND_API_URL = process.env.FEEDBACK_API_URL?.replace("/feedback", "") || "http://127.0.0.1:8000";
 
@@ -18,7 +19,7 @@ function isAllowedUrl(url: string): boolean {
   }
 }
 
-export async function GET() {
+export async function GET(request: NextRequest) {
   try {
     if (!isAllowedUrl(BACKEND_API_URL)) {
       return NextResponse.json(
@@ -30,6 +31,7 @@ export async function GET() {
     const response = await fetch(`${BACKEND_API_URL}/prompts`, {
       method: "GET",
       cache: "no-store",
+      headers: sessionHeaders(request),
     });
 
     if (!response.ok) {
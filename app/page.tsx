@@ -4,6 +4,7 @@ import { useState, useRef, useEffect } from "react";
 import type { Feedback, AppState, HistoryItem } from "@/lib/types";
 import { formatFeedbackAsMarkdown } from "@/lib/format";
 import { getHistory, addToHistory } from "@/lib/history";
+import { getSessionId } from "@/lib/session";
 
 type ModelInfo = {
   stt_models: string[];
@@ -37,7 +38,9 @@ export default function Home() {
   const fetchPrompts = async () => {
     setLoadingPrompts(true);
     try {
-      const response = await fetch("/api/prompts");
+      const response = await fetch("/api/prompts", {
+        headers: { "X-Session-ID": getSessionId() },
+      });
       if (response.ok) {
         const data = await response.json();
         setRecordingPrompts({
@@ -259,6 +262,7 @@ export default function Home() {
 
       const response = await fetch("/api/feedback", {
         method: "POST",
+        headers: { "X-Session-ID": getSessionId() },
         body: formData,
       });
 
@@ -5,6 +5,7 @@ import os
 import sys
 import time
 import json
+from functools import partial
 from pathlib import Path
 
 # Ensure backend directory is in Python path
@@ -12,37 +13,19 @@ backend_dir = Path(__file__).parent
 if str(backend_dir) not in sys.path:
     sys.path.insert(0, str(backend_dir))
 
-from fastapi import FastAPI, File, UploadFile, HTTPException, Body
+from fastapi import FastAPI, File, UploadFile, HTTPException, Body, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from pydantic_settings import BaseSettings
 from pydantic import BaseModel
 from typing import Optional, List
 
-from models import FeedbackResponse, TimingsMs, PromptsResponse
+from config import Settings
+from models import FeedbackResponse, TimingsMs, PromptsResponse, HistoryPage, ProgressResponse
 from stt import STTEngine
-from llm import LLMFeedbackGenerator
+from llm import LLMFeedbackGenerator, LLMFeedbackError
 from convert import convert_to_wav, save_temp_audio
-import ollama
-
-
-class Settings(BaseSettings):
-    """Application settings"""
-    stt_model: str = "base.en"
-    stt_device: str = "cuda"
-    stt_compute: str = "float16"
-    vad_silence_ms: int = 700
-    llm_provider: str = "ollama"
-    ollama_base_url: str = "http://127.0.0.1:11434"
-    ollama_model: str = "llama3.2:3b"
-    host: str = "127.0.0.1"
-    port: int = 8000
-    
-    model_config = {
-        "env_file": ".env",
-        "env_file_encoding": "utf-8",
-        "extra": "ignore"  # Ignore extra fields from .env
-    }
+from scheduler import FairScheduler, RateLimiter, RateLimited
+from history_store import HistoryStore
 
 
 # Load settings
@@ -52,14 +35,61 @@ settings = Settings()
 stt_engine = STTEngine(
     model_name=settings.stt_model,
     device=settings.stt_device,
-    compute_type=settings.stt_compute
+    compute_type=settings.stt_compute,
+    chunk_threshold_s=settings.stt_chunk_threshold_s,
+    chunk_length_s=settings.stt_chunk_length_s,
+    chunk_overlap_s=settings.stt_chunk_overlap_s,
+    chunk_workers=settings.stt_chunk_workers,
+    min_silence_ms=settings.vad_silence_ms,
+    cpu_backend=settings.stt_cpu_backend,
+    cache_dir=settings.stt_cache_dir or None,
+    intra_op_threads=settings.stt_intra_op_threads,
+    inter_op_threads=settings.stt_inter_op_threads
 )
 
 llm_generator = LLMFeedbackGenerator(
     base_url=settings.ollama_base_url,
-    model=settings.ollama_model
+    model=settings.ollama_model,
+    base_urls=settings.ollama_urls(),
+    health_interval_s=settings.ollama_health_interval_s,
+    failure_threshold=settings.ollama_failure_threshold,
+    circuit_reset_s=settings.ollama_circuit_reset_s,
+    request_timeout_s=settings.ollama_request_timeout_s,
+    probe_timeout_s=settings.ollama_probe_timeout_s
 )
 
+# Inference scheduling
+# Weights are keyed on the client address the server sees, never on X-Session-ID,
+# so a client cannot claim another's priority and weights never name a learner
+client_weights = {}
+for pair in settings.client_weights.split(","):
+    if "=" in pair:
+        client_host, weight = pair.split("=", 1)
+        client_weights[client_host.strip()] = float(weight)
+
+stt_scheduler = FairScheduler("stt", concurrency=settings.stt_concurrency)
+llm_scheduler = FairScheduler(
+    "llm",
+    concurrency=settings.llm_concurrency or len(llm_generator.base_urls)
+)
+rate_limiter = RateLimiter(
+    requests_per_min=settings.session_rate_per_min,
+    burst=settings.session_burst
+)
+
+# Learner history
+history_store = None
+if settings.history_db_path:
+    history_store = HistoryStore(
+        path=settings.history_db_path,
+        batch_size=settings.history_batch_size,
+        flush_interval_s=settings.history_flush_interval_s,
+        ewma_alpha=settings.history_ewma_alpha
+    )
+
+# 10 seconds of 16kHz mono 16-bit WAV audio counts as one unit of STT cost
+STT_COST_UNIT_BYTES = 16000 * 2 * 10
+
 # Create FastAPI app
 app = FastAPI(
     title="English Learning Feedback API",
@@ -77,11 +107,53 @@ app.add_middleware(
 )
 
 
+@app.on_event("shutdown")
+def shutdown():
+    """Commit queued history before exit"""
+    if history_store is not None:
+        history_store.close()
+
+
 class ModelChangeRequest(BaseModel):
     stt_model: Optional[str] = None
     llm_model: Optional[str] = None
 
 
+def get_learner_id(request: Request) -> Optional[str]:
+    """Learner ID from the X-Session-ID header, or None if the client sent none"""
+    session_id = request.headers.get("x-session-id", "").strip()
+    return session_id[:64] or None
+
+
+def get_session_id(request: Request) -> str:
+    """Session ID for scheduling, falling back to client address"""
+    learner_id = get_learner_id(request)
+    if learner_id:
+        return learner_id
+    return request.client.host if request.client else "anonymous"
+
+
+def get_client_weight(request: Request) -> float:
+    """Fair queuing weight for the connecting client address"""
+    host = request.client.host if request.client else ""
+    return client_weights.get(host, 1.0)
+
+
+def get_lane(request: Request, default: str) -> str:
+    """Clients may demote their own work to the bulk lane, never promote it"""
+    if request.headers.get("x-priority", "").lower() == "bulk":
+        return "bulk"
+    return default
+
+
+def check_rate_limit(session_id: str):
+    """Raise 429 if the session is over its rate limit"""
+    try:
+        rate_limiter.check(session_id)
+    except RateLimited as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -93,6 +165,25 @@ async def health_check():
     }
 
 
+@app.get("/llm/endpoints")
+async def get_llm_endpoints():
+    """Get Ollama endpoint health and latency metrics"""
+    return {
+        "model": llm_generator.model,
+        "endpoints": llm_generator.client.metrics()
+    }
+
+
+@app.get("/admin/queue")
+async def get_queue_state():
+    """Get inference queue state per stage, lane and session (session IDs are hashed)"""
+    return {
+        "stt": stt_scheduler.snapshot(),
+        "llm": llm_scheduler.snapshot(),
+        "rate_limits": rate_limiter.snapshot()
+    }
+
+
 @app.get("/models")
 async def get_available_models():
     """Get available models"""
@@ -109,8 +200,7 @@ async def get_available_models():
     # Get Ollama models
     ollama_models = []
     try:
-        client = ollama.Client(host=settings.ollama_base_url)
-        models_list = client.list()
+        models_list = llm_generator.client.list()
         ollama_models = [model["name"] for model in models_list.get("models", [])]
     except Exception as e:
         print(f"Error fetching Ollama models: {e}")
@@ -141,8 +231,7 @@ async def change_models(request: ModelChangeRequest):
         if request.llm_model:
             # Verify model exists in Ollama
             try:
-                client = ollama.Client(host=settings.ollama_base_url)
-                models_list = client.list()
+                models_list = llm_generator.client.list()
                 available_models = [model["name"] for model in models_list.get("models", [])]
                 if request.llm_model not in available_models:
                     raise HTTPException(
@@ -171,17 +260,23 @@ async def change_models(request: ModelChangeRequest):
 
 
 @app.post("/feedback", response_model=FeedbackResponse)
-async def feedback_endpoint(audio: UploadFile = File(...)):
+async def feedback_endpoint(request: Request, audio: UploadFile = File(...)):
     """
     Process audio and return feedback
     
     Args:
+        request: Incoming request (X-Session-ID / X-Priority headers)
         audio: Audio file (WebM/Opus recommended)
     
     Returns:
         FeedbackResponse with transcript and feedback
     """
     total_start = time.time()
+    session_id = get_session_id(request)
+    learner_id = get_learner_id(request)
+    weight = get_client_weight(request)
+    lane = get_lane(request, "interactive")
+    check_rate_limit(session_id)
     
     try:
         # Read audio data
@@ -208,19 +303,49 @@ async def feedback_endpoint(audio: UploadFile = File(...)):
             wav_data = audio_data
         
         # STT: Transcribe audio
-        raw_transcript, stt_time_ms = stt_engine.transcribe_bytes(wav_data)
+        raw_transcript, stt_time_ms, stt_chunks = await stt_scheduler.run(
+            session_id,
+            lane,
+            stt_engine.transcribe_bytes,
+            wav_data,
+            cost=max(1.0, len(wav_data) / STT_COST_UNIT_BYTES),
+            weight=weight
+        )
         
         # LLM: Generate feedback
-        feedback, llm_time_ms = llm_generator.generate_feedback(raw_transcript)
+        # Empty transcripts and LLM failures get a placeholder that is never persisted
+        graded = bool(raw_transcript.strip())
+        try:
+            feedback, llm_time_ms = await llm_scheduler.run(
+                session_id,
+                lane,
+                partial(llm_generator.generate_feedback, strict=True),
+                raw_transcript,
+                weight=weight
+            )
+        except LLMFeedbackError as e:
+            print(f"Error generating feedback: {e}")
+            feedback, llm_time_ms = e.fallback, e.elapsed_ms
+            graded = False
         
         # Update timings
         total_time_ms = (time.time() - total_start) * 1000
         feedback.timings_ms = TimingsMs(
             stt=round(stt_time_ms),
             llm=round(llm_time_ms),
-            total=round(total_time_ms)
+            total=round(total_time_ms),
+            stt_chunks=stt_chunks or None
         )
         
+        # Persist in the background; without a session ID there is no learner to file it under
+        if history_store is not None and graded and learner_id:
+            history_store.add(
+                learner_id,
+                feedback,
+                stt_model=stt_engine.model_name,
+                llm_model=llm_generator.model
+            )
+        
         return feedback
         
     except Exception as e:
@@ -231,14 +356,67 @@ async def feedback_endpoint(audio: UploadFile = File(...)):
         )
 
 
+def get_history_store() -> HistoryStore:
+    """History store, or 404 if history is disabled"""
+    if history_store is None:
+        raise HTTPException(status_code=404, detail="History is disabled")
+    return history_store
+
+
+# History endpoints are plain def so their SQLite reads run in the threadpool,
+# not on the event loop serving /feedback
+@app.get("/learners/{learner_id}/history", response_model=HistoryPage)
+def get_learner_history(
+    learner_id: str,
+    limit: int = Query(20, ge=1, le=100),
+    before: Optional[int] = None
+):
+    """
+    Get a learner's feedback history, newest first
+    
+    Args:
+        learner_id: Learner (session) ID
+        limit: Page size
+        before: Cursor from the previous page's next_cursor
+    
+    Returns:
+        HistoryPage with items and the next cursor
+    """
+    items, next_cursor = get_history_store().list_history(learner_id, limit=limit, before_id=before)
+    return HistoryPage(items=items, next_cursor=next_cursor)
+
+
+@app.get("/learners/{learner_id}/progress", response_model=ProgressResponse)
+def get_learner_progress(learner_id: str):
+    """
+    Get a learner's aggregated progress
+    
+    Args:
+        learner_id: Learner (session) ID
+    
+    Returns:
+        ProgressResponse with overall and rolling score averages
+    """
+    progress = get_history_store().get_progress(learner_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail=f"No history for learner {learner_id}")
+    return ProgressResponse(**progress)
+
+
 @app.get("/prompts", response_model=PromptsResponse)
-async def get_prompts():
+async def get_prompts(request: Request):
     """
     Generate random practice prompts using LLM
     
+    Args:
+        request: Incoming request (X-Session-ID / X-Priority headers)
+    
     Returns:
         PromptsResponse with topics, grammar points, and advice
     """
+    session_id = get_session_id(request)
+    check_rate_limit(session_id)
+    
     try:
         prompt = """Generate practice prompts for English learning. Return ONLY valid JSON in this exact format:
 {
@@ -255,12 +433,18 @@ Requirements:
 Make them diverse and engaging. Return ONLY the JSON, no additional text."""
 
         # Call Ollama
-        response = llm_generator.client.generate(
-            model=llm_generator.model,
-            prompt=prompt,
-            options={
-                "temperature": 0.8,  # Higher temperature for more variety
-            }
+        response = await llm_scheduler.run(
+            session_id,
+            get_lane(request, "prompts"),
+            partial(
+                llm_generator.client.generate,
+                model=llm_generator.model,
+                prompt=prompt,
+                options={
+                    "temperature": 0.8,  # Higher temperature for more variety
+                }
+            ),
+            weight=get_client_weight(request)
         )
         
         # Extract JSON from response
@@ -0,0 +1,89 @@
+"""
+Benchmark CPU STT backends on the same clips
+
+Usage:
+    python benchmark_stt.py clip1.wav clip2.wav --model base.en --runs 3
+
+Compares the stock PyTorch path with the int8 TorchScript encoder and
+reports median latency, real-time factor and whether transcripts match.
+"""
+import argparse
+import statistics
+import sys
+from pathlib import Path
+
+# Ensure backend directory is in Python path
+backend_dir = Path(__file__).parent
+if str(backend_dir) not in sys.path:
+    sys.path.insert(0, str(backend_dir))
+
+import whisper
+
+from stt import STTEngine, SAMPLE_RATE
+from whisper_export import CPU_BACKENDS
+
+
+def benchmark(engine: STTEngine, clips: list[Path], runs: int) -> dict[Path, tuple[str, float]]:
+    """
+    Transcribe each clip several times after one warm-up run
+
+    Returns:
+        Map of clip to (transcript, median_elapsed_ms)
+    """
+    results = {}
+    for clip in clips:
+        engine.transcribe(clip)  # Warm-up
+        timings = []
+        transcript = ""
+        for _ in range(runs):
+            transcript, elapsed_ms, _ = engine.transcribe(clip)
+            timings.append(elapsed_ms)
+        results[clip] = (transcript, statistics.median(timings))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare CPU STT backends")
+    parser.add_argument("clips", type=Path, nargs="+", help="Audio clips to transcribe")
+    parser.add_argument("--model", default="base.en", help="Whisper model name")
+    parser.add_argument("--runs", type=int, default=3, help="Timed runs per clip")
+    parser.add_argument("--intra-op-threads", type=int, default=0, help="PyTorch intra-op threads (0 = default)")
+    parser.add_argument("--cache-dir", type=Path, help="Directory for exported encoders")
+    args = parser.parse_args(argv)
+
+    durations = {clip: len(whisper.load_audio(str(clip))) / SAMPLE_RATE for clip in args.clips}
+
+    results = {}
+    for backend in CPU_BACKENDS:
+        engine = STTEngine(
+            model_name=args.model,
+            device="cpu",
+            cpu_backend=backend,
+            cache_dir=args.cache_dir,
+            intra_op_threads=args.intra_op_threads,
+            # Keep every clip on the single-model path so backends are comparable
+            chunk_threshold_s=float("inf")
+        )
+        results[backend] = benchmark(engine, args.clips, args.runs)
+
+    baseline = CPU_BACKENDS[0]
+    print(f"{'clip':40} {'backend':18} {'median ms':>10} {'RTF':>6} {'speedup':>8}  transcript")
+    for clip in args.clips:
+        base_text, base_ms = results[baseline][clip]
+        for backend in CPU_BACKENDS:
+            text, ms = results[backend][clip]
+            match = "same" if text == base_text else "differs"
+            print(
+                f"{clip.name[:40]:40} {backend:18} {ms:10.0f} "
+                f"{ms / 1000 / durations[clip]:6.2f} {base_ms / ms:7.2f}x  {match}"
+            )
+            if text != base_text:
+                print(f"    {backend}: {text}")
+
+    for backend in CPU_BACKENDS:
+        total_ms = sum(ms for _, ms in results[backend].values())
+        print(f"Total {backend}: {total_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+"""
+Offline bulk transcription and grading
+Walks a directory of recordings and appends FeedbackResponse records to JSONL
+
+Usage:
+    python bulk.py corpus/ -o results.jsonl
+
+Re-running with the same output file skips recordings whose SHA-256 is
+already recorded, so an interrupted run resumes where it left off.
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+# Ensure backend directory is in Python path
+backend_dir = Path(__file__).parent
+if str(backend_dir) not in sys.path:
+    sys.path.insert(0, str(backend_dir))
+
+# Decode workers are spawned and re-import this module, so keep top-level
+# imports light; torch/Whisper is imported in main()
+from config import Settings
+from models import TimingsMs
+from convert import load_audio_array
+from llm import LLMFeedbackError
+
+
+AUDIO_EXTENSIONS = {".wav", ".webm", ".mp3", ".m4a", ".mp4", ".ogg", ".flac"}
+
+
+def find_recordings(root: Path) -> list[Path]:
+    """Audio files under root, in a stable order"""
+    return sorted(
+        path for path in root.rglob("*")
+        if path.is_file() and path.suffix.lower() in AUDIO_EXTENSIONS
+    )
+
+
+def file_sha256(path: Path) -> str:
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_done_hashes(output_path: Path) -> set[str]:
+    """
+    Hashes already processed successfully
+
+    A line truncated by a crash is ignored so the file is retried.
+    """
+    done = set()
+    if not output_path.exists():
+        return done
+
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if "error" not in record and "sha256" in record:
+                done.add(record["sha256"])
+    return done
+
+
+def decode_recording(path: Path) -> tuple[np.ndarray, float]:
+    """
+    Decode a recording to the 16kHz float32 array Whisper takes (runs in a worker process)
+
+    Returns:
+        Tuple of (samples, elapsed_time_ms)
+    """
+    start_time = time.time()
+    audio = load_audio_array(path)
+    return audio, (time.time() - start_time) * 1000
+
+
+def open_output(output_path: Path):
+    """Open the JSONL file for appending, terminating any truncated last line"""
+    if output_path.exists() and output_path.stat().st_size > 0:
+        with open(output_path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            needs_newline = f.read(1) != b"\n"
+        if needs_newline:
+            with open(output_path, "ab") as f:
+                f.write(b"\n")
+    return open(output_path, "a", encoding="utf-8")
+
+
+def write_record(out, record: dict):
+    """Append one record and flush it to disk"""
+    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+    out.flush()
+    os.fsync(out.fileno())
+
+
+def find_pending(input_dir: Path, output_path: Path) -> tuple[list[tuple[Path, str]], int]:
+    """
+    Recordings still to process
+
+    Recordings already in the output are skipped, and duplicate files in the
+    corpus are processed once.
+
+    Returns:
+        Tuple of ([(path, sha256)], skipped_count)
+    """
+    done = load_done_hashes(output_path)
+    pending = []
+    skipped = 0
+    for path in find_recordings(input_dir):
+        sha256 = file_sha256(path)
+        if sha256 in done:
+            skipped += 1
+            continue
+        pending.append((path, sha256))
+        done.add(sha256)
+    return pending, skipped
+
+
+def run_pipeline(
+    pending: list[tuple[Path, str]],
+    input_dir: Path,
+    out,
+    stt_engine,
+    llm_generator,
+    decode_pool: Executor,
+    prefetch: int = 8,
+    stt_batch: int = 1,
+    llm_concurrency: int = 1,
+    decode: Callable[[Path], tuple] = decode_recording
+) -> tuple[int, int]:
+    """
+    Decode, transcribe and grade recordings, appending one record per recording
+
+    The stages overlap: decodes run ahead on decode_pool, STT runs in batches on
+    this thread, and LLM requests run on a thread pool. Records are written in
+    input order.
+
+    Args:
+        pending: (path, sha256) of each recording
+        input_dir: Root that recorded file names are relative to
+        out: Open JSONL output file
+        stt_engine: STTEngine (or anything with transcribe_batch and model_name)
+        llm_generator: LLMFeedbackGenerator (or anything with generate_feedback and model)
+        decode_pool: Executor that runs decode
+        prefetch: Recordings decoded ahead of transcription
+        stt_batch: Recordings transcribed together
+        llm_concurrency: Concurrent LLM requests
+        decode: Decoder returning (samples, elapsed_time_ms)
+
+    Returns:
+        Tuple of (graded_count, failed_count)
+    """
+    graded = 0
+    failed = 0
+
+    def grade(raw_transcript: str):
+        return llm_generator.generate_feedback(raw_transcript, strict=True)
+
+    with ThreadPoolExecutor(max_workers=max(1, llm_concurrency)) as llm_pool:
+        to_decode = iter(pending)
+        decoding = deque()
+        # (record, timings, future); future is None for records that already failed
+        results = deque()
+
+        def fill_decodes():
+            while len(decoding) < max(prefetch, stt_batch):
+                item = next(to_decode, None)
+                if item is None:
+                    return
+                decoding.append((item, decode_pool.submit(decode, item[0])))
+
+        def write_ready(wait_oldest: bool):
+            nonlocal graded, failed
+            # Write finished results in input order, optionally waiting for the oldest
+            while results and (wait_oldest or results[0][2] is None or results[0][2].done()):
+                wait_oldest = False
+                record, timings, future = results.popleft()
+                if future is None:
+                    write_record(out, record)
+                    failed += 1
+                    continue
+                decode_ms, stt_ms, stt_chunks = timings
+                try:
+                    feedback, llm_ms = future.result()
+                except LLMFeedbackError as e:
+                    print(f"Error grading {record['file']}: {e}")
+                    record["error"] = str(e)
+                    write_record(out, record)
+                    failed += 1
+                    continue
+                feedback.timings_ms = TimingsMs(
+                    stt=round(stt_ms),
+                    llm=round(llm_ms),
+                    total=round(decode_ms + stt_ms + llm_ms),
+                    stt_chunks=stt_chunks or None
+                )
+                record["decode_ms"] = round(decode_ms)
+                record["feedback"] = feedback.model_dump()
+                write_record(out, record)
+                graded += 1
+                if graded % 10 == 0:
+                    print(f"Graded {graded}/{len(pending)}")
+
+        fill_decodes()
+        while decoding:
+            # Take the next batch of decoded recordings
+            batch = []
+            while decoding and len(batch) < stt_batch:
+                (path, sha256), future = decoding.popleft()
+                record = {
+                    "file": str(path.relative_to(input_dir)),
+                    "sha256": sha256,
+                    "stt_model": stt_engine.model_name,
+                    "llm_model": llm_generator.model,
+                }
+                try:
+                    audio, decode_ms = future.result()
+                except Exception as e:
+                    print(f"Error decoding {path}: {e}")
+                    record["error"] = str(e)
+                    results.append((record, None, None))
+                    continue
+                batch.append((record, audio, decode_ms))
+            fill_decodes()
+
+            transcripts = stt_engine.transcribe_batch([audio for _, audio, _ in batch]) if batch else []
+            for (record, _, decode_ms), transcript in zip(batch, transcripts):
+                if isinstance(transcript, Exception):
+                    print(f"Error transcribing {record['file']}: {transcript}")
+                    record["error"] = str(transcript)
+                    results.append((record, None, None))
+                    continue
+                raw_transcript, stt_ms, stt_chunks = transcript
+                results.append((record, (decode_ms, stt_ms, stt_chunks), llm_pool.submit(grade, raw_transcript)))
+
+            # Bound LLM work in flight so results are written as they finish
+            while len(results) > llm_concurrency * 2 + stt_batch:
+                write_ready(wait_oldest=True)
+            write_ready(wait_oldest=False)
+
+        while results:
+            write_ready(wait_oldest=True)
+
+    return graded, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Transcribe and grade a directory of recordings")
+    parser.add_argument("input_dir", type=Path, help="Directory of recordings (searched recursively)")
+    parser.add_argument("-o", "--output", type=Path, default=Path("bulk_results.jsonl"), help="JSONL output file")
+    parser.add_argument("--decode-workers", type=int, default=os.cpu_count() or 1, help="Processes used for audio decoding")
+    parser.add_argument("--prefetch", type=int, default=8, help="Recordings decoded ahead of transcription")
+    parser.add_argument("--stt-batch", type=int, default=0, help="Recordings transcribed together (0 = one per STT chunk worker)")
+    parser.add_argument("--llm-concurrency", type=int, default=0, help="Concurrent LLM requests (0 = one per Ollama endpoint)")
+    parser.add_argument("--stt-model", help="Override STT_MODEL")
+    parser.add_argument("--llm-model", help="Override OLLAMA_MODEL")
+    args = parser.parse_args(argv)
+
+    if not args.input_dir.is_dir():
+        parser.error(f"Not a directory: {args.input_dir}")
+
+    settings = Settings()
+
+    # Skip recordings already in the output
+    pending, skipped = find_pending(args.input_dir, args.output)
+    print(f"{len(pending)} recordings to process ({skipped} already done)")
+    if not pending:
+        return
+
+    # Start decode workers before any model or background thread exists
+    decode_pool = ProcessPoolExecutor(
+        max_workers=args.decode_workers,
+        mp_context=multiprocessing.get_context("spawn")
+    )
+
+    from stt import STTEngine
+    from llm import LLMFeedbackGenerator
+
+    stt_engine = STTEngine(
+        model_name=args.stt_model or settings.stt_model,
+        device=settings.stt_device,
+        compute_type=settings.stt_compute,
+        chunk_threshold_s=settings.stt_chunk_threshold_s,
+        chunk_length_s=settings.stt_chunk_length_s,
+        chunk_overlap_s=settings.stt_chunk_overlap_s,
+        chunk_workers=settings.stt_chunk_workers,
+        min_silence_ms=settings.vad_silence_ms,
+        cpu_backend=settings.stt_cpu_backend,
+        cache_dir=settings.stt_cache_dir or None,
+        intra_op_threads=settings.stt_intra_op_threads,
+        inter_op_threads=settings.stt_inter_op_threads
+    )
+
+    llm_generator = LLMFeedbackGenerator(
+        base_url=settings.ollama_base_url,
+        model=args.llm_model or settings.ollama_model,
+        base_urls=settings.ollama_urls(),
+        health_interval_s=settings.ollama_health_interval_s,
+        failure_threshold=settings.ollama_failure_threshold,
+        circuit_reset_s=settings.ollama_circuit_reset_s,
+        request_timeout_s=settings.ollama_request_timeout_s,
+        probe_timeout_s=settings.ollama_probe_timeout_s
+    )
+
+    run_start = time.time()
+    with decode_pool, open_output(args.output) as out:
+        graded, failed = run_pipeline(
+            pending,
+            args.input_dir,
+            out,
+            stt_engine,
+            llm_generator,
+            decode_pool,
+            prefetch=args.prefetch,
+            stt_batch=args.stt_batch or max(1, settings.stt_chunk_workers),
+            llm_concurrency=args.llm_concurrency or settings.llm_concurrency or len(llm_generator.base_urls)
+        )
+
+    elapsed_s = time.time() - run_start
+    print(f"Done: {graded} graded, {failed} failed in {elapsed_s:.1f}s, results in {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Silence-based chunking for long recordings
+Split audio at pauses and stitch chunk transcripts back together
+"""
+import math
+import re
+
+import numpy as np
+
+
+SAMPLE_RATE = 16000  # Whisper input rate
+FRAME_MS = 30
+SILENCE_RMS = 0.01  # ~ -40 dBFS
+MIN_OVERLAP_WORDS = 2  # A single repeated word is too often real speech
+MAX_WORDS_PER_S = 4  # Upper bound on speech rate, limits how much overlap can repeat
+
+
+def split_on_silence(
+    audio: np.ndarray,
+    chunk_s: float,
+    overlap_s: float,
+    min_silence_ms: int
+) -> list[tuple[int, int]]:
+    """
+    Split audio into chunks, cutting at silence where possible
+    
+    Args:
+        audio: Float32 mono audio at 16kHz
+        chunk_s: Maximum chunk length in seconds
+        overlap_s: Seconds of audio shared between neighbouring chunks
+                   when no silence was found to cut at
+        min_silence_ms: Preferred minimum silence length for a cut
+    
+    Returns:
+        List of (start_sample, end_sample) ranges
+    """
+    frame_len = SAMPLE_RATE * FRAME_MS // 1000
+    n_frames = len(audio) // frame_len
+    if n_frames == 0:
+        return [(0, len(audio))]
+    
+    frames = audio[:n_frames * frame_len].reshape(n_frames, frame_len)
+    rms = np.sqrt(np.mean(frames ** 2, axis=1))
+    silent = rms < SILENCE_RMS
+    
+    chunk_frames = max(1, int(chunk_s * 1000 / FRAME_MS))
+    min_silence_frames = max(1, min_silence_ms // FRAME_MS)
+    overlap = int(overlap_s * SAMPLE_RATE)
+    
+    # Cut points in frames, with whether each fell back to the quietest frame
+    cuts: list[tuple[int, bool]] = []
+    start = 0
+    while n_frames - start > chunk_frames:
+        # Search the second half of the window for a cut point
+        lo = start + max(1, chunk_frames // 2)
+        hi = start + chunk_frames
+        cut = None
+        
+        # Prefer the middle of the longest silent run
+        best_len = 0
+        run_start = None
+        for i in range(lo, hi + 1):
+            if i < hi and silent[i]:
+                if run_start is None:
+                    run_start = i
+            elif run_start is not None:
+                if i - run_start > best_len:
+                    best_len = i - run_start
+                    cut = (run_start + i) // 2
+                run_start = None
+        
+        # Otherwise cut at the quietest frame
+        fallback = cut is None or best_len < min_silence_frames
+        if fallback:
+            cut = lo + int(np.argmin(rms[lo:hi]))
+        
+        cuts.append((cut, fallback))
+        start = cut
+    
+    # A cut inside a pause needs no overlap; a fallback cut may split a word,
+    # so both neighbours extend past it
+    ranges = []
+    start, start_fallback = 0, False
+    for cut, fallback in cuts + [(None, False)]:
+        s = start * frame_len - (overlap if start_fallback else 0)
+        e = len(audio) if cut is None else cut * frame_len + (overlap if fallback else 0)
+        ranges.append((max(0, s), min(len(audio), e)))
+        start, start_fallback = cut, fallback
+    return ranges
+
+
+def _normalize_word(word: str) -> str:
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+def stitch_transcripts(texts: list[str], ranges: list[tuple[int, int]]) -> str:
+    """
+    Join chunk transcripts, removing words repeated in the overlap
+    
+    Words are only dropped where neighbouring chunks share audio, and no more
+    than could have been spoken in the shared audio.
+    
+    Args:
+        texts: Chunk transcripts in order
+        ranges: (start_sample, end_sample) of each chunk, from split_on_silence
+    
+    Returns:
+        Combined transcript
+    """
+    words: list[str] = []
+    prev_end = None
+    for text, (start, end) in zip(texts, ranges):
+        new_words = text.split()
+        if not new_words:
+            # Nothing to de-duplicate against the next chunk
+            prev_end = None
+            continue
+        
+        overlap_s = 0.0 if prev_end is None else max(0, prev_end - start) / SAMPLE_RATE
+        prev_end = end
+        
+        # Longest suffix of the transcript so far that prefixes the new chunk
+        max_k = min(math.ceil(overlap_s * MAX_WORDS_PER_S), len(words), len(new_words))
+        for k in range(max_k, MIN_OVERLAP_WORDS - 1, -1):
+            tail = [_normalize_word(w) for w in words[-k:]]
+            head = [_normalize_word(w) for w in new_words[:k]]
+            if tail == head:
+                new_words = new_words[k:]
+                break
+        
+        words.extend(new_words)
+    return " ".join(words)
@@ -0,0 +1,51 @@
+"""
+Application settings loaded from environment / .env
+"""
+from pydantic_settings import BaseSettings
+
+
+class Settings(BaseSettings):
+    """Application settings"""
+    stt_model: str = "base.en"
+    stt_device: str = "cuda"
+    stt_compute: str = "float16"
+    vad_silence_ms: int = 700
+    stt_chunk_threshold_s: float = 60.0
+    stt_chunk_length_s: float = 30.0
+    stt_chunk_overlap_s: float = 1.0
+    stt_chunk_workers: int = 2
+    stt_cpu_backend: str = "torch"  # torch or torchscript_int8
+    stt_cache_dir: str = ""  # Default: ~/.cache/english-train/whisper
+    stt_intra_op_threads: int = 0  # 0 = PyTorch default
+    stt_inter_op_threads: int = 0
+    llm_provider: str = "ollama"
+    ollama_base_url: str = "http://127.0.0.1:11434"
+    ollama_model: str = "llama3.2:3b"
+    ollama_base_urls: str = ""  # Comma-separated; overrides ollama_base_url
+    ollama_health_interval_s: float = 10.0
+    ollama_failure_threshold: int = 3
+    ollama_circuit_reset_s: float = 30.0
+    ollama_request_timeout_s: float = 120.0
+    ollama_probe_timeout_s: float = 5.0
+    stt_concurrency: int = 1
+    llm_concurrency: int = 0  # 0 = one per Ollama endpoint
+    session_rate_per_min: float = 30.0  # 0 disables rate limiting
+    session_burst: int = 10
+    client_weights: str = ""  # Comma-separated client_address=weight pairs
+    history_db_path: str = "history.db"  # Empty disables history
+    history_batch_size: int = 32
+    history_flush_interval_s: float = 1.0
+    history_ewma_alpha: float = 0.2
+    host: str = "127.0.0.1"
+    port: int = 8000
+    
+    model_config = {
+        "env_file": ".env",
+        "env_file_encoding": "utf-8",
+        "extra": "ignore"  # Ignore extra fields from .env
+    }
+
+    def ollama_urls(self) -> list[str]:
+        """Ollama endpoints from OLLAMA_BASE_URLS, or OLLAMA_BASE_URL alone"""
+        urls = [url.strip() for url in self.ollama_base_urls.split(",") if url.strip()]
+        return urls or [self.ollama_base_url]
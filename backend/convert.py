@@ -7,6 +7,7 @@ import tempfile
 from pathlib import Path
 from typing import BinaryIO
 
+import numpy as np
 from pydub import AudioSegment
 
 
@@ -58,3 +59,19 @@ def save_temp_audio(audio_data: bytes, suffix: str = ".wav") -> Path:
     temp_file.write(audio_data)
     temp_file.close()
     return Path(temp_file.name)
+
+
+def load_audio_array(path: Path) -> np.ndarray:
+    """
+    Decode an audio file to a 16kHz mono float32 array, as Whisper expects
+    
+    Args:
+        path: Audio file (any format FFmpeg can read)
+    
+    Returns:
+        Samples in [-1, 1]
+    """
+    audio = AudioSegment.from_file(path)
+    audio = audio.set_frame_rate(16000).set_channels(1).set_sample_width(2)
+    samples = np.frombuffer(audio.raw_data, dtype=np.int16)
+    return samples.astype(np.float32) / 32768.0
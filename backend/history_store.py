@@ -0,0 +1,269 @@
+"""
+Learner history storage
+SQLite (WAL) store of feedback results with incrementally maintained progress aggregates
+"""
+import json
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from models import FeedbackResponse
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS feedback (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    learner_id TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    score INTEGER NOT NULL,
+    vocabulary INTEGER NOT NULL,
+    grammar INTEGER NOT NULL,
+    understandability INTEGER NOT NULL,
+    stt_model TEXT,
+    llm_model TEXT,
+    stt_ms INTEGER,
+    llm_ms INTEGER,
+    total_ms INTEGER,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_feedback_learner ON feedback (learner_id, id DESC);
+
+CREATE TABLE IF NOT EXISTS learner_progress (
+    learner_id TEXT PRIMARY KEY,
+    count INTEGER NOT NULL,
+    sum_score INTEGER NOT NULL,
+    sum_vocabulary INTEGER NOT NULL,
+    sum_grammar INTEGER NOT NULL,
+    sum_understandability INTEGER NOT NULL,
+    ewma_score REAL NOT NULL,
+    ewma_vocabulary REAL NOT NULL,
+    ewma_grammar REAL NOT NULL,
+    ewma_understandability REAL NOT NULL,
+    first_at REAL NOT NULL,
+    last_at REAL NOT NULL
+);
+"""
+
+INSERT_FEEDBACK = """
+INSERT INTO feedback (
+    learner_id, created_at, score, vocabulary, grammar, understandability,
+    stt_model, llm_model, stt_ms, llm_ms, total_ms, payload
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# The first result seeds the rolling averages; later ones move them by alpha (?7)
+UPSERT_PROGRESS = """
+INSERT INTO learner_progress VALUES (?1, 1, ?2, ?3, ?4, ?5, ?2, ?3, ?4, ?5, ?6, ?6)
+ON CONFLICT (learner_id) DO UPDATE SET
+    count = count + 1,
+    sum_score = sum_score + ?2,
+    sum_vocabulary = sum_vocabulary + ?3,
+    sum_grammar = sum_grammar + ?4,
+    sum_understandability = sum_understandability + ?5,
+    ewma_score = ewma_score + ?7 * (?2 - ewma_score),
+    ewma_vocabulary = ewma_vocabulary + ?7 * (?3 - ewma_vocabulary),
+    ewma_grammar = ewma_grammar + ?7 * (?4 - ewma_grammar),
+    ewma_understandability = ewma_understandability + ?7 * (?5 - ewma_understandability),
+    last_at = ?6
+"""
+
+
+class HistoryStore:
+    """
+    Persist feedback results off the request path
+
+    add() only enqueues; a writer thread commits queued results in batches,
+    updating per-learner aggregates in the same transaction so progress
+    reads never scan history.
+    """
+
+    def __init__(
+        self,
+        path: str = "history.db",
+        batch_size: int = 32,
+        flush_interval_s: float = 1.0,
+        ewma_alpha: float = 0.2
+    ):
+        """
+        Initialize history store
+
+        Args:
+            path: SQLite database file
+            batch_size: Maximum results committed per transaction
+            flush_interval_s: Maximum time a result waits before being committed
+            ewma_alpha: Weight of the newest result in rolling averages
+        """
+        self.path = str(path)
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        self.ewma_alpha = ewma_alpha
+
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._write_conn = self._connect()
+        self._write_conn.executescript(SCHEMA)
+        self._read_conn = self._connect()
+        self._read_lock = threading.Lock()
+
+        self._queue: queue.Queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="history-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def add(
+        self,
+        learner_id: str,
+        feedback: FeedbackResponse,
+        stt_model: Optional[str] = None,
+        llm_model: Optional[str] = None
+    ):
+        """
+        Queue a feedback result for storage
+
+        Args:
+            learner_id: Learner (session) ID
+            feedback: Feedback with timings
+            stt_model: STT model used
+            llm_model: LLM model used
+        """
+        self._queue.put((learner_id, time.time(), feedback, stt_model, llm_model))
+
+    def close(self):
+        """Commit queued results and stop the writer"""
+        self._queue.put(None)
+        self._writer.join()
+        self._write_conn.close()
+        self._read_conn.close()
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            batch = [item]
+
+            # Gather whatever else arrives within the flush interval
+            deadline = time.time() + self.flush_interval_s
+            while item is not None and len(batch) < self.batch_size:
+                timeout = deadline - time.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                batch.append(item)
+
+            stop = batch[-1] is None
+            results = [entry for entry in batch if entry is not None]
+            if results:
+                try:
+                    self._write_batch(results)
+                except sqlite3.Error as e:
+                    print(f"Error writing history: {e}")
+            if stop:
+                return
+
+    def _write_batch(self, results: list[tuple]):
+        with self._write_conn:
+            for learner_id, created_at, feedback, stt_model, llm_model in results:
+                breakdown = feedback.score_breakdown
+                timings = feedback.timings_ms
+                self._write_conn.execute(INSERT_FEEDBACK, (
+                    learner_id,
+                    created_at,
+                    feedback.score,
+                    breakdown.vocabulary,
+                    breakdown.grammar,
+                    breakdown.understandability,
+                    stt_model,
+                    llm_model,
+                    timings.stt if timings else None,
+                    timings.llm if timings else None,
+                    timings.total if timings else None,
+                    feedback.model_dump_json(),
+                ))
+                self._write_conn.execute(UPSERT_PROGRESS, (
+                    learner_id,
+                    feedback.score,
+                    breakdown.vocabulary,
+                    breakdown.grammar,
+                    breakdown.understandability,
+                    created_at,
+                    self.ewma_alpha,
+                ))
+
+    def list_history(
+        self,
+        learner_id: str,
+        limit: int = 20,
+        before_id: Optional[int] = None
+    ) -> tuple[list[dict], Optional[int]]:
+        """
+        Page through a learner's results, newest first
+
+        Args:
+            learner_id: Learner (session) ID
+            limit: Page size
+            before_id: Cursor from the previous page
+
+        Returns:
+            Tuple of (entries, next_cursor); next_cursor is None on the last page
+        """
+        query = "SELECT id, created_at, stt_model, llm_model, payload FROM feedback WHERE learner_id = ?"
+        params: list = [learner_id]
+        if before_id is not None:
+            query += " AND id < ?"
+            params.append(before_id)
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(limit + 1)
+
+        with self._read_lock:
+            rows = self._read_conn.execute(query, params).fetchall()
+
+        entries = [
+            {
+                "id": row["id"],
+                "created_at": row["created_at"],
+                "stt_model": row["stt_model"],
+                "llm_model": row["llm_model"],
+                "feedback": json.loads(row["payload"]),
+            }
+            for row in rows[:limit]
+        ]
+        next_cursor = entries[-1]["id"] if len(rows) > limit else None
+        return entries, next_cursor
+
+    def get_progress(self, learner_id: str) -> Optional[dict]:
+        """
+        Aggregated progress for a learner
+
+        Returns:
+            Progress dict, or None if the learner has no results
+        """
+        with self._read_lock:
+            row = self._read_conn.execute(
+                "SELECT * FROM learner_progress WHERE learner_id = ?",
+                (learner_id,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        count = row["count"]
+        categories = ("score", "vocabulary", "grammar", "understandability")
+        return {
+            "learner_id": learner_id,
+            "count": count,
+            "average": {c: round(row[f"sum_{c}"] / count, 1) for c in categories},
+            "rolling_average": {c: round(row[f"ewma_{c}"], 1) for c in categories},
+            "first_at": row["first_at"],
+            "last_at": row["last_at"],
+        }
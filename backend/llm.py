@@ -4,11 +4,20 @@ Fixed JSON schema output for consistent feedback format
 """
 import json
 import time
-import ollama
 from typing import Optional
 from pydantic import ValidationError
 
 from models import FeedbackResponse, ScoreBreakdown
+from ollama_pool import OllamaPool
+
+
+class LLMFeedbackError(Exception):
+    """Raised in strict mode when the LLM could not grade a transcript"""
+    
+    def __init__(self, message: str, fallback: FeedbackResponse, elapsed_ms: float):
+        super().__init__(message)
+        self.fallback = fallback  # The placeholder response non-strict callers get
+        self.elapsed_ms = elapsed_ms
 
 
 class LLMFeedbackGenerator:
@@ -17,18 +26,44 @@ class LLMFeedbackGenerator:
     def __init__(
         self,
         base_url: str = "http://127.0.0.1:11434",
-        model: str = "llama3.2:3b"
+        model: str = "llama3.2:3b",
+        base_urls: Optional[list[str]] = None,
+        health_interval_s: float = 10.0,
+        failure_threshold: int = 3,
+        circuit_reset_s: float = 30.0,
+        request_timeout_s: float = 120.0,
+        probe_timeout_s: float = 5.0,
+        client_factory=None
     ):
         """
         Initialize LLM feedback generator
         
         Args:
-            base_url: Ollama base URL
+            base_url: Ollama base URL (used when base_urls is empty)
             model: Model name to use
+            base_urls: Ollama base URLs to load balance across
+            health_interval_s: Seconds between endpoint health probes
+            failure_threshold: Consecutive failures before failing over
+            circuit_reset_s: Seconds before retrying a failed endpoint
+            request_timeout_s: Timeout for LLM calls
+            probe_timeout_s: Timeout for health probes
+            client_factory: Optional client builder from (url, timeout) (e.g. a fake in tests)
         """
-        self.base_url = base_url
+        self.base_urls = base_urls or [base_url]
+        self.base_url = self.base_urls[0]
         self.model = model
-        self.client = ollama.Client(host=base_url)
+        pool_options = {}
+        if client_factory is not None:
+            pool_options["client_factory"] = client_factory
+        self.client = OllamaPool(
+            self.base_urls,
+            health_interval_s=health_interval_s,
+            failure_threshold=failure_threshold,
+            circuit_reset_s=circuit_reset_s,
+            request_timeout_s=request_timeout_s,
+            probe_timeout_s=probe_timeout_s,
+            **pool_options
+        )
     
     def change_model(self, model: str):
         """
@@ -98,12 +133,18 @@ General Rules:
 
 Return ONLY valid JSON, no additional text."""
 
-    def generate_feedback(self, raw_transcript: str) -> tuple[FeedbackResponse, float]:
+    def generate_feedback(
+        self,
+        raw_transcript: str,
+        strict: bool = False
+    ) -> tuple[FeedbackResponse, float]:
         """
         Generate feedback for raw transcript
         
         Args:
             raw_transcript: Raw transcript text
+            strict: Raise LLMFeedbackError instead of returning a placeholder
+                    response when the LLM call or parsing fails
         
         Returns:
             Tuple of (FeedbackResponse, elapsed_time_ms)
@@ -191,7 +232,7 @@ Return ONLY valid JSON, no additional text."""
         except json.JSONDecodeError as e:
             # Fallback if JSON parsing fails
             print(f"JSON decode error: {e}")
-            return FeedbackResponse(
+            fallback = FeedbackResponse(
                 raw_transcript=raw_transcript,
                 corrected=raw_transcript,
                 issues=["LLM response parsing failed"],
@@ -206,11 +247,15 @@ Return ONLY valid JSON, no additional text."""
                     grammar_reason="LLM response parsing failed",
                     understandability_reason="LLM response parsing failed"
                 )
-            ), (time.time() - start_time) * 1000
+            )
+            elapsed_ms = (time.time() - start_time) * 1000
+            if strict:
+                raise LLMFeedbackError(f"LLM response parsing failed: {e}", fallback, elapsed_ms) from e
+            return fallback, elapsed_ms
             
         except Exception as e:
             print(f"LLM error: {e}")
-            return FeedbackResponse(
+            fallback = FeedbackResponse(
                 raw_transcript=raw_transcript,
                 corrected=raw_transcript,
                 issues=[f"LLM error: {str(e)}"],
@@ -225,4 +270,8 @@ Return ONLY valid JSON, no additional text."""
                     grammar_reason=f"LLM error: {str(e)}",
                     understandability_reason=f"LLM error: {str(e)}"
                 )
-            ), (time.time() - start_time) * 1000
+            )
+            elapsed_ms = (time.time() - start_time) * 1000
+            if strict:
+                raise LLMFeedbackError(f"LLM error: {e}", fallback, elapsed_ms) from e
+            return fallback, elapsed_ms
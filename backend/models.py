@@ -5,11 +5,19 @@ from typing import Optional
 from pydantic import BaseModel, Field
 
 
+class ChunkTiming(BaseModel):
+    """STT timing for one chunk of a long recording"""
+    start_s: float
+    end_s: float
+    stt: int
+
+
 class TimingsMs(BaseModel):
     """Timing information in milliseconds"""
     stt: Optional[int] = None
     llm: Optional[int] = None
     total: Optional[int] = None
+    stt_chunks: Optional[list[ChunkTiming]] = None
 
 
 class PromptsResponse(BaseModel):
@@ -52,3 +60,36 @@ class FeedbackResponse(BaseModel):
                 "timings_ms": {"stt": 1200, "llm": 3500, "total": 5000}
             }
         }
+
+
+class HistoryEntry(BaseModel):
+    """Stored feedback result"""
+    id: int
+    created_at: float = Field(..., description="Unix timestamp")
+    stt_model: Optional[str] = None
+    llm_model: Optional[str] = None
+    feedback: FeedbackResponse
+
+
+class HistoryPage(BaseModel):
+    """Page of a learner's history, newest first"""
+    items: list[HistoryEntry]
+    next_cursor: Optional[int] = Field(None, description="Pass as 'before' to get the next page")
+
+
+class ScoreAverages(BaseModel):
+    """Average scores by category"""
+    score: float
+    vocabulary: float
+    grammar: float
+    understandability: float
+
+
+class ProgressResponse(BaseModel):
+    """Aggregated learner progress"""
+    learner_id: str
+    count: int
+    average: ScoreAverages = Field(..., description="Average over all results")
+    rolling_average: ScoreAverages = Field(..., description="Exponentially weighted average favouring recent results")
+    first_at: float
+    last_at: float
@@ -0,0 +1,297 @@
+"""
+Load-balanced pool of Ollama endpoints
+Least-outstanding-requests routing with health probes and circuit breaking
+"""
+import threading
+import time
+from typing import Any, Callable, List, Optional
+
+import httpx
+import ollama
+
+
+class NoEndpointAvailable(Exception):
+    """Raised when every endpoint is down or circuit-open"""
+
+
+def is_endpoint_failure(error: Exception) -> bool:
+    """
+    Whether an error means the endpoint itself is unavailable
+
+    Connection errors, timeouts and 5xx responses fail over to another
+    endpoint; anything else (e.g. a missing model or bad request) would
+    fail the same way everywhere.
+    """
+    if isinstance(error, ollama.ResponseError):
+        return error.status_code >= 500
+    return isinstance(error, (httpx.TransportError, ConnectionError, TimeoutError))
+
+
+def default_client_factory(url: str, timeout: float) -> ollama.Client:
+    return ollama.Client(host=url, timeout=timeout)
+
+
+class OllamaEndpoint:
+    """State and latency metrics for a single Ollama server"""
+
+    def __init__(self, url: str, client: Any, probe_client: Any):
+        self.url = url
+        self.client = client
+        self.probe_client = probe_client
+        self.outstanding = 0
+        self.healthy = True
+        self.models: Optional[set[str]] = None  # Unknown until first probe
+
+        # Circuit breaker
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.half_open_in_flight = False
+
+        # Latency metrics
+        self.requests = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.ewma_ms: Optional[float] = None
+        self.last_ms: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def metrics(self, reset_s: float) -> dict:
+        """Snapshot of endpoint state"""
+        successes = self.requests - self.errors
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "circuit": self.circuit_state(time.time(), reset_s),
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "errors": self.errors,
+            "avg_ms": round(self.total_ms / successes) if successes else None,
+            "ewma_ms": round(self.ewma_ms) if self.ewma_ms is not None else None,
+            "last_ms": round(self.last_ms) if self.last_ms is not None else None,
+            "last_error": self.last_error,
+            "models": sorted(self.models) if self.models is not None else None,
+        }
+
+    def circuit_state(self, now: float, reset_s: float) -> str:
+        """Return closed, open or half_open"""
+        if self.opened_at is None:
+            return "closed"
+        if now - self.opened_at >= reset_s:
+            return "half_open"
+        return "open"
+
+
+class OllamaPool:
+    """
+    Spread Ollama calls over several servers
+
+    Exposes generate() and list() like ollama.Client so it can be used
+    as a drop-in client.
+    """
+
+    EWMA_ALPHA = 0.2
+
+    def __init__(
+        self,
+        urls: list[str],
+        health_interval_s: float = 10.0,
+        failure_threshold: int = 3,
+        circuit_reset_s: float = 30.0,
+        request_timeout_s: float = 120.0,
+        probe_timeout_s: float = 5.0,
+        client_factory: Callable[[str, float], Any] = default_client_factory
+    ):
+        """
+        Initialize endpoint pool
+
+        Args:
+            urls: Ollama base URLs
+            health_interval_s: Seconds between health probes (0 disables probing)
+            failure_threshold: Consecutive failures before an endpoint's circuit opens
+            circuit_reset_s: Seconds before an open circuit allows a trial request
+            request_timeout_s: Timeout for generate calls
+            probe_timeout_s: Timeout for health probes and model listing
+            client_factory: Builds a client from (url, timeout) (swap in a fake for tests)
+        """
+        if not urls:
+            raise ValueError("At least one Ollama URL is required")
+
+        self.endpoints = [
+            OllamaEndpoint(url, client_factory(url, request_timeout_s), client_factory(url, probe_timeout_s))
+            for url in urls
+        ]
+        self.health_interval_s = health_interval_s
+        self.failure_threshold = failure_threshold
+        self.circuit_reset_s = circuit_reset_s
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._health_thread: Optional[threading.Thread] = None
+
+        if health_interval_s > 0:
+            self._health_thread = threading.Thread(
+                target=self._health_loop,
+                name="ollama-health",
+                daemon=True
+            )
+            self._health_thread.start()
+
+    def close(self):
+        """Stop health probing"""
+        self._stop.set()
+
+    def _health_loop(self):
+        while not self._stop.is_set():
+            self.probe()
+            self._stop.wait(self.health_interval_s)
+
+    def probe(self):
+        """
+        Check every endpoint is reachable and record its models
+
+        Probes only update health and models. Listing models says nothing about
+        whether generate works, so the circuit is left to request outcomes.
+        """
+        for endpoint in self.endpoints:
+            try:
+                models_list = endpoint.probe_client.list()
+                models = {model["name"] for model in models_list.get("models", [])}
+            except Exception as e:
+                with self._lock:
+                    endpoint.healthy = False
+                    endpoint.last_error = str(e)
+                continue
+
+            with self._lock:
+                endpoint.healthy = True
+                endpoint.models = models
+
+    def _acquire(self, model: Optional[str], exclude: set[str]) -> Optional[OllamaEndpoint]:
+        """Pick the available endpoint with the fewest outstanding requests"""
+        now = time.time()
+        with self._lock:
+            available = []
+            for endpoint in self.endpoints:
+                if endpoint.url in exclude:
+                    continue
+                state = endpoint.circuit_state(now, self.circuit_reset_s)
+                if state == "open":
+                    continue
+                if state == "half_open" and endpoint.half_open_in_flight:
+                    continue
+                available.append(endpoint)
+
+            # A failed probe may be stale, so try unhealthy endpoints rather than none
+            candidates = [e for e in available if e.healthy] or available
+
+            # Prefer endpoints known to have the model
+            if model:
+                with_model = [
+                    e for e in candidates
+                    if e.models is None or model in e.models
+                ]
+                candidates = with_model or candidates
+
+            if not candidates:
+                return None
+
+            # Break ties on recent latency
+            endpoint = min(candidates, key=lambda e: (e.outstanding, e.ewma_ms or 0.0))
+            if endpoint.circuit_state(now, self.circuit_reset_s) == "half_open":
+                endpoint.half_open_in_flight = True
+            endpoint.outstanding += 1
+            return endpoint
+
+    def _release(self, endpoint: OllamaEndpoint, elapsed_ms: float, error: Optional[Exception]):
+        """Record the outcome of a request; only endpoint failures count toward the circuit"""
+        with self._lock:
+            endpoint.outstanding -= 1
+            endpoint.half_open_in_flight = False
+            endpoint.requests += 1
+
+            if error is None or not is_endpoint_failure(error):
+                # The server answered, so it is reachable
+                endpoint.healthy = True
+
+            if error is None:
+                endpoint.total_ms += elapsed_ms
+                endpoint.last_ms = elapsed_ms
+                if endpoint.ewma_ms is None:
+                    endpoint.ewma_ms = elapsed_ms
+                else:
+                    endpoint.ewma_ms += self.EWMA_ALPHA * (elapsed_ms - endpoint.ewma_ms)
+                endpoint.consecutive_failures = 0
+                endpoint.opened_at = None
+                return
+
+            endpoint.errors += 1
+            endpoint.last_error = str(error)
+            if not is_endpoint_failure(error):
+                endpoint.consecutive_failures = 0
+                endpoint.opened_at = None
+                return
+
+            endpoint.consecutive_failures += 1
+            if endpoint.consecutive_failures >= self.failure_threshold:
+                if endpoint.opened_at is None:
+                    print(f"Ollama endpoint {endpoint.url} circuit opened: {error}")
+                endpoint.opened_at = time.time()
+
+    def generate(self, model: str, prompt: str, **kwargs) -> dict:
+        """
+        Call generate on the least loaded endpoint, failing over when it is unavailable
+
+        Args:
+            model: Model name
+            prompt: Prompt text
+            **kwargs: Passed through to ollama.Client.generate
+
+        Returns:
+            Ollama generate response
+        """
+        tried: set[str] = set()
+        last_error: Optional[Exception] = None
+
+        while True:
+            endpoint = self._acquire(model, exclude=tried)
+            if endpoint is None:
+                break
+            tried.add(endpoint.url)
+
+            start_time = time.time()
+            try:
+                response = endpoint.client.generate(model=model, prompt=prompt, **kwargs)
+            except Exception as e:
+                self._release(endpoint, (time.time() - start_time) * 1000, e)
+                if not is_endpoint_failure(e):
+                    raise
+                print(f"Ollama endpoint {endpoint.url} failed, trying next: {e}")
+                last_error = e
+                continue
+
+            self._release(endpoint, (time.time() - start_time) * 1000, None)
+            return response
+
+        if last_error is not None:
+            raise last_error
+        raise NoEndpointAvailable("No Ollama endpoint available")
+
+    def list(self) -> dict:
+        """List models available on any reachable endpoint"""
+        names: set[str] = set()
+        last_error: Optional[Exception] = None
+        for endpoint in self.endpoints:
+            try:
+                models_list = endpoint.probe_client.list()
+            except Exception as e:
+                last_error = e
+                continue
+            names.update(model["name"] for model in models_list.get("models", []))
+
+        if not names and last_error is not None:
+            raise last_error
+        return {"models": [{"name": name} for name in sorted(names)]}
+
+    def metrics(self) -> List[dict]:
+        """Per-endpoint state and latency metrics"""
+        with self._lock:
+            return [endpoint.metrics(self.circuit_reset_s) for endpoint in self.endpoints]
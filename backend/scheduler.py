@@ -0,0 +1,249 @@
+"""
+Fair scheduling for inference work
+Weighted fair queuing per session with priority lanes and per-session rate limits
+"""
+import asyncio
+import hashlib
+import hmac
+import heapq
+import itertools
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+
+LANES = ("interactive", "prompts", "bulk")  # Highest priority first
+
+# Per-process key: labels are stable while the server runs but cannot be reversed
+_LABEL_KEY = os.urandom(16)
+
+
+def session_label(session_id: str) -> str:
+    """
+    Opaque label for a session ID in monitoring output
+
+    Session IDs double as learner IDs for history, so they are never exposed.
+    """
+    return hmac.new(_LABEL_KEY, session_id.encode(), hashlib.sha256).hexdigest()[:12]
+
+
+class RateLimited(Exception):
+    """Raised when a session exceeds its request rate"""
+
+
+class RateLimiter:
+    """Token bucket per session"""
+
+    MAX_BUCKETS = 10000
+
+    def __init__(self, requests_per_min: float = 30.0, burst: int = 10):
+        """
+        Initialize rate limiter
+
+        Args:
+            requests_per_min: Sustained requests per minute per session (0 disables limiting)
+            burst: Requests a session may make back to back
+        """
+        self.rate = requests_per_min / 60.0
+        self.burst = burst
+        self._buckets: dict[str, tuple[float, float]] = {}  # session -> (tokens, updated_at)
+
+    def _tokens(self, session_id: str, now: float) -> float:
+        tokens, updated_at = self._buckets.get(session_id, (float(self.burst), now))
+        return min(float(self.burst), tokens + (now - updated_at) * self.rate)
+
+    def check(self, session_id: str):
+        """
+        Take one token for a session
+
+        Raises:
+            RateLimited: If the session has no tokens left
+        """
+        if self.rate <= 0:
+            return
+
+        now = time.time()
+        tokens = self._tokens(session_id, now)
+        if tokens < 1.0:
+            self._buckets[session_id] = (tokens, now)
+            retry_after = (1.0 - tokens) / self.rate
+            raise RateLimited(f"Rate limit exceeded, retry in {retry_after:.1f}s")
+        self._buckets[session_id] = (tokens - 1.0, now)
+
+        # Forget sessions whose buckets have refilled
+        if len(self._buckets) > self.MAX_BUCKETS:
+            self._buckets = {
+                sid: bucket for sid, bucket in self._buckets.items()
+                if self._tokens(sid, now) < self.burst
+            }
+
+    def snapshot(self) -> dict:
+        """Remaining tokens per tracked session"""
+        now = time.time()
+        return {
+            "requests_per_min": self.rate * 60.0,
+            "burst": self.burst,
+            "sessions": {
+                session_label(sid): round(self._tokens(sid, now), 2) for sid in self._buckets
+            },
+        }
+
+
+class _Job:
+    def __init__(self, session_id: str, lane: str, start_tag: float, finish_tag: float):
+        self.session_id = session_id
+        self.lane = lane
+        self.start_tag = start_tag
+        self.finish_tag = finish_tag
+        self.enqueued_at = time.time()
+        self.granted: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+class FairScheduler:
+    """
+    Run blocking inference calls with bounded concurrency
+
+    Lanes are served in strict priority order. Within a lane, sessions
+    share capacity by weighted fair queuing: each job gets a virtual finish
+    time (its session's start tag plus cost / weight) and the smallest finish
+    time runs next, so one session queueing many jobs cannot starve others.
+
+    Fairness is per session ID as given by the caller; a client that invents
+    a new ID per request is treated as many sessions.
+    """
+
+    MAX_SESSIONS = 1000  # Bound on tracked finish tags and per-session stats
+
+    def __init__(self, name: str, concurrency: int = 1):
+        """
+        Initialize scheduler
+
+        Args:
+            name: Name shown in queue state (e.g. stt, llm)
+            concurrency: Number of jobs allowed to run at once
+        """
+        self.name = name
+        self.concurrency = max(1, concurrency)
+        self._queues: dict[str, list] = {lane: [] for lane in LANES}
+        self._virtual_time: dict[str, float] = {lane: 0.0 for lane in LANES}
+        self._last_finish: dict[tuple[str, str], float] = {}
+        self._seq = itertools.count()
+        self._running = 0
+
+        # Stats for the most recently served sessions: session -> [served, total_wait_ms]
+        self._stats: OrderedDict[str, list] = OrderedDict()
+
+    async def run(
+        self,
+        session_id: str,
+        lane: str,
+        fn: Callable[..., Any],
+        *args,
+        cost: float = 1.0,
+        weight: float = 1.0
+    ) -> Any:
+        """
+        Wait for a slot, then run fn(*args) in a worker thread
+
+        Args:
+            session_id: Session or client ID used for fairness
+            lane: One of LANES
+            fn: Blocking function to run
+            *args: Arguments for fn
+            cost: Relative cost of the job (e.g. audio length)
+            weight: Share of capacity relative to other sessions
+
+        Returns:
+            Result of fn
+        """
+        if lane not in self._queues:
+            raise ValueError(f"Unknown lane: {lane}")
+
+        key = (lane, session_id)
+        start_tag = max(self._virtual_time[lane], self._last_finish.get(key, 0.0))
+        finish_tag = start_tag + cost / weight
+        self._last_finish[key] = finish_tag
+
+        job = _Job(session_id, lane, start_tag, finish_tag)
+        heapq.heappush(self._queues[lane], (finish_tag, next(self._seq), job))
+        self._dispatch()
+
+        try:
+            await job.granted
+        except asyncio.CancelledError:
+            # Slot was granted just before cancellation; hand it back
+            if job.granted.done() and not job.granted.cancelled():
+                self._release()
+            raise
+
+        try:
+            return await asyncio.to_thread(fn, *args)
+        finally:
+            self._release()
+
+    def _release(self):
+        self._running -= 1
+        self._dispatch()
+
+    def _dispatch(self):
+        """Grant free slots to the next jobs"""
+        while self._running < self.concurrency:
+            job = self._pop_next()
+            if job is None:
+                break
+
+            self._virtual_time[job.lane] = max(self._virtual_time[job.lane], job.start_tag)
+            self._running += 1
+            self._record_wait(job.session_id, (time.time() - job.enqueued_at) * 1000)
+            job.granted.set_result(None)
+
+        # Drop finish tags that no longer affect ordering
+        if len(self._last_finish) > self.MAX_SESSIONS:
+            self._last_finish = {
+                key: finish for key, finish in self._last_finish.items()
+                if finish > self._virtual_time[key[0]]
+            }
+
+    def _record_wait(self, session_id: str, wait_ms: float):
+        stats = self._stats.pop(session_id, [0, 0.0])
+        stats[0] += 1
+        stats[1] += wait_ms
+        self._stats[session_id] = stats
+        if len(self._stats) > self.MAX_SESSIONS:
+            self._stats.popitem(last=False)
+
+    def _pop_next(self) -> Optional[_Job]:
+        for lane in LANES:
+            queue = self._queues[lane]
+            while queue:
+                _, _, job = heapq.heappop(queue)
+                if not job.granted.cancelled():
+                    return job
+        return None
+
+    def snapshot(self) -> dict:
+        """Queue state for the admin endpoint"""
+        lanes = {}
+        for lane in LANES:
+            sessions: dict[str, int] = {}
+            for _, _, job in self._queues[lane]:
+                if not job.granted.cancelled():
+                    label = session_label(job.session_id)
+                    sessions[label] = sessions.get(label, 0) + 1
+            lanes[lane] = {
+                "queued": sum(sessions.values()),
+                "sessions": sessions,
+            }
+
+        return {
+            "name": self.name,
+            "concurrency": self.concurrency,
+            "running": self._running,
+            "lanes": lanes,
+            "served": {session_label(sid): served for sid, (served, _) in self._stats.items()},
+            "avg_wait_ms": {
+                session_label(sid): round(wait_ms / served)
+                for sid, (served, wait_ms) in self._stats.items()
+            },
+        }
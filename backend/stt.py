@@ -5,10 +5,61 @@ GPU-accelerated speech-to-text with raw transcript output
 import time
 import torch
 import whisper
+import numpy as np
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Optional
 import os
 
+from chunking import SAMPLE_RATE, split_on_silence, stitch_transcripts
+from models import ChunkTiming
+from whisper_export import CPU_BACKENDS, DEFAULT_CACHE_DIR, configure_threads, optimize_encoder
+
+
+# Per-process model used by chunk workers
+_worker_model = None
+
+
+def _load_cpu_model(model_name: str, cpu_backend: str, cache_dir: Path):
+    """Load Whisper on CPU, optionally with the optimized encoder"""
+    model = whisper.load_model(model_name, device="cpu")
+    if cpu_backend == "torchscript_int8":
+        optimize_encoder(model, model_name, cache_dir)
+    return model
+
+
+def _init_chunk_worker(
+    model_name: str,
+    intra_op_threads: int,
+    inter_op_threads: int,
+    cpu_backend: str,
+    cache_dir: Path
+):
+    """Load Whisper once per worker process"""
+    global _worker_model
+    configure_threads(intra_op_threads, inter_op_threads)
+    _worker_model = _load_cpu_model(model_name, cpu_backend, cache_dir)
+
+
+def _transcribe_chunk_worker(audio: np.ndarray) -> tuple[str, float]:
+    """Transcribe one chunk inside a worker process"""
+    return _transcribe_array(_worker_model, audio, fp16=False)
+
+
+def _transcribe_array(model, audio: np.ndarray, fp16: bool) -> tuple[str, float]:
+    """Run Whisper on a float32 16kHz array and time it"""
+    start_time = time.time()
+    result = model.transcribe(
+        audio,
+        language="en",
+        task="transcribe",
+        fp16=fp16,
+        verbose=False
+    )
+    return result["text"].strip(), (time.time() - start_time) * 1000
+
 
 class STTEngine:
     """Whisper-based STT engine"""
@@ -17,7 +68,16 @@ class STTEngine:
         self,
         model_name: str = "base.en",
         device: str = "cuda",
-        compute_type: str = "float16"
+        compute_type: str = "float16",
+        chunk_threshold_s: float = 60.0,
+        chunk_length_s: float = 30.0,
+        chunk_overlap_s: float = 1.0,
+        chunk_workers: int = 2,
+        min_silence_ms: int = 700,
+        cpu_backend: str = "torch",
+        cache_dir: Optional[Path] = None,
+        intra_op_threads: int = 0,
+        inter_op_threads: int = 0
     ):
         """
         Initialize STT engine
@@ -26,43 +86,193 @@ class STTEngine:
             model_name: Whisper model name (base.en, small.en, etc.)
             device: Device to use (cuda, cpu)
             compute_type: Compute type (float16, float32, int8)
+            chunk_threshold_s: Audio longer than this is transcribed in chunks
+            chunk_length_s: Maximum chunk length in seconds
+            chunk_overlap_s: Overlap between neighbouring chunks in seconds
+            chunk_workers: Worker processes for CPU chunk transcription
+            min_silence_ms: Preferred silence length for chunk boundaries
+            cpu_backend: CPU inference path (torch, torchscript_int8)
+            cache_dir: Directory for exported encoders
+            intra_op_threads: PyTorch intra-op threads on CPU (0 = default)
+            inter_op_threads: PyTorch inter-op threads on CPU (0 = default)
         """
+        if cpu_backend not in CPU_BACKENDS:
+            raise ValueError(f"Invalid CPU backend: {cpu_backend}. Available: {CPU_BACKENDS}")
+
         self.model_name = model_name
         self.device = device if torch.cuda.is_available() and device == "cuda" else "cpu"
         self.compute_type = compute_type if self.device == "cuda" else "float32"
+        self.chunk_threshold_s = chunk_threshold_s
+        self.chunk_length_s = chunk_length_s
+        self.chunk_overlap_s = chunk_overlap_s
+        self.chunk_workers = chunk_workers
+        self.min_silence_ms = min_silence_ms
+        self.cpu_backend = cpu_backend if self.device == "cpu" else "torch"
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        
+        if self.device == "cpu":
+            configure_threads(intra_op_threads, inter_op_threads)
         
         # Load model
-        print(f"Loading Whisper model: {model_name} on {self.device}")
-        self.model = whisper.load_model(model_name, device=self.device)
+        print(f"Loading Whisper model: {model_name} on {self.device} ({self.cpu_backend})")
+        self.model = self._load_model(model_name)
         print(f"Model loaded successfully")
     
-    def transcribe(self, audio_path: Path) -> tuple[str, float]:
+    def _load_model(self, model_name: str):
+        if self.device == "cpu":
+            return _load_cpu_model(model_name, self.cpu_backend, self.cache_dir)
+        return whisper.load_model(model_name, device=self.device)
+    
+    def transcribe(self, audio_path: Path) -> tuple[str, float, list[ChunkTiming]]:
         """
         Transcribe audio file to raw text
         
+        On CPU with more than one chunk worker, recordings longer than
+        chunk_threshold_s are split at silence and transcribed in parallel.
+        Otherwise Whisper's own 30 second window is used in a single pass.
+        
         Args:
             audio_path: Path to audio file
         
         Returns:
-            Tuple of (transcript, elapsed_time_ms)
+            Tuple of (transcript, elapsed_time_ms, chunk_timings)
+            chunk_timings is empty when the audio was not chunked
         """
         start_time = time.time()
+        audio = whisper.load_audio(str(audio_path))
+        raw_text, _, chunk_timings = self.transcribe_array(audio)
+        # Include decoding in the reported STT time
+        return raw_text, (time.time() - start_time) * 1000, chunk_timings
+    
+    def transcribe_array(self, audio: np.ndarray) -> tuple[str, float, list[ChunkTiming]]:
+        """
+        Transcribe already decoded audio
         
-        # Transcribe with no language specified (auto-detect) or force English
-        result = self.model.transcribe(
-            str(audio_path),
-            language="en",
-            task="transcribe",
-            fp16=(self.compute_type == "float16"),
-            verbose=False
-        )
+        Args:
+            audio: 16kHz mono float32 samples
         
-        elapsed_ms = (time.time() - start_time) * 1000
+        Returns:
+            Tuple of (transcript, elapsed_time_ms, chunk_timings)
+        """
+        start_time = time.time()
+        fp16 = self.compute_type == "float16"
         
-        # Extract raw text (no post-processing)
-        raw_text = result["text"].strip()
+        # Chunking only pays off when chunks run in parallel
+        parallel = self.device == "cpu" and self.chunk_workers > 1
+        if not parallel or len(audio) <= self.chunk_threshold_s * SAMPLE_RATE:
+            # Extract raw text (no post-processing)
+            raw_text, _ = _transcribe_array(self.model, audio, fp16=fp16)
+            return raw_text, (time.time() - start_time) * 1000, []
+        
+        # Submit under the lock so change_model cannot retire the pool mid-submit
+        with self._pool_lock:
+            ranges, futures = self._submit(audio)
+        raw_text, _, chunk_timings = self._collect(ranges, futures)
+        return raw_text, (time.time() - start_time) * 1000, chunk_timings
+    
+    def transcribe_batch(self, audios: list[np.ndarray]) -> list:
+        """
+        Transcribe several recordings at once
+        
+        On a parallel CPU pool every recording (split into chunks if long) is
+        queued together, so short recordings keep all workers busy instead of
+        running one at a time. Otherwise recordings run in turn.
+        
+        Args:
+            audios: 16kHz mono float32 samples per recording
         
-        return raw_text, elapsed_ms
+        Returns:
+            Per recording, (transcript, elapsed_time_ms, chunk_timings) or the
+            exception it failed with; elapsed_time_ms is the worker time spent
+            on that recording
+        """
+        results = []
+        parallel = self.device == "cpu" and self.chunk_workers > 1
+        if not parallel:
+            for audio in audios:
+                try:
+                    results.append(self.transcribe_array(audio))
+                except Exception as e:
+                    results.append(e)
+            return results
+        
+        # Submit under the lock so change_model cannot retire the pool mid-submit
+        threshold = self.chunk_threshold_s * SAMPLE_RATE
+        with self._pool_lock:
+            submitted = [self._submit(audio, chunk=len(audio) > threshold) for audio in audios]
+        for ranges, futures in submitted:
+            try:
+                results.append(self._collect(ranges, futures))
+            except Exception as e:
+                results.append(e)
+        return results
+    
+    def _submit(self, audio: np.ndarray, chunk: bool = True) -> tuple[list[tuple[int, int]], list]:
+        """Queue a recording on the chunk pool (caller holds _pool_lock)"""
+        if chunk:
+            ranges = split_on_silence(
+                audio,
+                chunk_s=self.chunk_length_s,
+                overlap_s=self.chunk_overlap_s,
+                min_silence_ms=self.min_silence_ms
+            )
+        else:
+            ranges = [(0, len(audio))]
+        pool = self._get_pool()
+        futures = [pool.submit(_transcribe_chunk_worker, audio[s:e]) for s, e in ranges]
+        return ranges, futures
+    
+    def _collect(self, ranges: list[tuple[int, int]], futures: list) -> tuple[str, float, list[ChunkTiming]]:
+        """Wait for a recording's chunks and stitch them"""
+        results = [future.result() for future in futures]
+        raw_text = stitch_transcripts([text for text, _ in results], ranges)
+        if len(ranges) == 1:
+            return raw_text, results[0][1], []
+        
+        chunk_timings = [
+            ChunkTiming(
+                start_s=round(s / SAMPLE_RATE, 2),
+                end_s=round(e / SAMPLE_RATE, 2),
+                stt=round(ms)
+            )
+            for (s, e), (_, ms) in zip(ranges, results)
+        ]
+        return raw_text, sum(ms for _, ms in results), chunk_timings
+    
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Lazily start the chunk worker pool (caller holds _pool_lock)"""
+        if self._pool is None:
+            # Without explicit settings, split the cores between workers
+            intra_op_threads = self.intra_op_threads or max(1, (os.cpu_count() or 1) // self.chunk_workers)
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.chunk_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_chunk_worker,
+                initargs=(
+                    self.model_name,
+                    intra_op_threads,
+                    self.inter_op_threads,
+                    self.cpu_backend,
+                    self.cache_dir
+                )
+            )
+        return self._pool
+    
+    def _retire_pool(self):
+        """Drop the chunk worker pool, letting in-flight chunks finish"""
+        with self._pool_lock:
+            old_pool, self._pool = self._pool, None
+        if old_pool is not None:
+            threading.Thread(
+                target=old_pool.shutdown,
+                kwargs={"wait": True},
+                name="stt-pool-shutdown",
+                daemon=True
+            ).start()
     
     def change_model(self, model_name: str):
         """
@@ -76,10 +286,12 @@ class STTEngine:
         
         print(f"Changing Whisper model from {self.model_name} to {model_name}")
         self.model_name = model_name
-        self.model = whisper.load_model(model_name, device=self.device)
+        self.model = self._load_model(model_name)
+        # Workers load the model on startup; the next chunked request starts a new pool
+        self._retire_pool()
         print(f"Model changed successfully")
     
-    def transcribe_bytes(self, audio_bytes: bytes) -> tuple[str, float]:
+    def transcribe_bytes(self, audio_bytes: bytes) -> tuple[str, float, list[ChunkTiming]]:
         """
         Transcribe audio bytes directly
         
@@ -87,7 +299,7 @@ class STTEngine:
             audio_bytes: Audio data as bytes
         
         Returns:
-            Tuple of (transcript, elapsed_time_ms)
+            Tuple of (transcript, elapsed_time_ms, chunk_timings)
         """
         # Save to temp file
         from convert import save_temp_audio
@@ -0,0 +1,10 @@
+"""
+Shared test setup
+"""
+import sys
+from pathlib import Path
+
+# Backend modules import each other by bare name (as app.py does)
+backend_dir = Path(__file__).parent.parent
+if str(backend_dir) not in sys.path:
+    sys.path.insert(0, str(backend_dir))
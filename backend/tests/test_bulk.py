@@ -0,0 +1,133 @@
+"""
+Tests for the bulk CLI pipeline and resume handling
+"""
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bulk import find_pending, load_done_hashes, open_output, run_pipeline, write_record
+from llm import LLMFeedbackError
+from models import FeedbackResponse, ScoreBreakdown
+
+
+def test_resume_skips_only_successful_records(tmp_path):
+    output = tmp_path / "results.jsonl"
+    with open_output(output) as out:
+        write_record(out, {"file": "a.wav", "sha256": "a", "feedback": {}})
+        write_record(out, {"file": "b.wav", "sha256": "b", "error": "LLM error: refused"})
+
+    assert load_done_hashes(output) == {"a"}
+
+
+def test_truncated_last_line_is_ignored_and_terminated(tmp_path):
+    output = tmp_path / "results.jsonl"
+    output.write_text('{"file": "a.wav", "sha256": "a"}\n{"file": "b.wav", "sha2')
+
+    assert load_done_hashes(output) == {"a"}
+
+    with open_output(output) as out:
+        write_record(out, {"file": "b.wav", "sha256": "b"})
+    assert load_done_hashes(output) == {"a", "b"}
+
+
+class FakeSTT:
+    model_name = "fake-stt"
+
+    def __init__(self):
+        self.batches = []
+
+    def transcribe_batch(self, audios):
+        self.batches.append(len(audios))
+        return [RuntimeError("stt failed") if audio == "bad-stt" else (audio, 20.0, []) for audio in audios]
+
+
+class FakeLLM:
+    model = "fake-llm"
+
+    def generate_feedback(self, raw_transcript, strict=False):
+        if raw_transcript == "bad-llm":
+            raise LLMFeedbackError("LLM error: refused", None, 1.0)
+        if raw_transcript == "slow":
+            time.sleep(0.1)
+        return FeedbackResponse(
+            raw_transcript=raw_transcript,
+            corrected=raw_transcript,
+            issues=[],
+            better_options=[],
+            drill="",
+            score=80,
+            score_breakdown=ScoreBreakdown(
+                vocabulary=80,
+                grammar=80,
+                understandability=80,
+                vocabulary_reason="",
+                grammar_reason="",
+                understandability_reason=""
+            )
+        ), 30.0
+
+
+def fake_decode(path):
+    # The file's text stands in for decoded samples
+    text = path.read_text()
+    if text == "bad-decode":
+        raise ValueError("cannot decode")
+    return text, 10.0
+
+
+def run_corpus(tmp_path, contents: dict[str, str], **kwargs) -> list[dict]:
+    corpus = tmp_path / "corpus"
+    corpus.mkdir(exist_ok=True)
+    for name, text in contents.items():
+        (corpus / name).write_text(text)
+
+    output = tmp_path / "results.jsonl"
+    pending, _ = find_pending(corpus, output)
+    with ThreadPoolExecutor(max_workers=2) as decode_pool, open_output(output) as out:
+        run_pipeline(pending, corpus, out, kwargs.pop("stt", FakeSTT()), FakeLLM(), decode_pool, decode=fake_decode, **kwargs)
+    return [json.loads(line) for line in output.read_text().splitlines()]
+
+
+def test_pipeline_writes_records_in_input_order_with_timings(tmp_path):
+    contents = {"a.wav": "slow", "b.wav": "fine", "c.wav": "also fine"}
+    records = run_corpus(tmp_path, contents, stt_batch=2, llm_concurrency=4)
+
+    # a's grading finishes last but it is still written first
+    assert [r["file"] for r in records] == ["a.wav", "b.wav", "c.wav"]
+    first = records[0]
+    assert first["stt_model"] == "fake-stt"
+    assert first["llm_model"] == "fake-llm"
+    assert first["decode_ms"] == 10
+    assert first["feedback"]["raw_transcript"] == "slow"
+    assert first["feedback"]["timings_ms"] == {"stt": 20, "llm": 30, "total": 60, "stt_chunks": None}
+
+
+def test_pipeline_records_errors_for_each_stage(tmp_path):
+    contents = {"a.wav": "bad-decode", "b.wav": "bad-stt", "c.wav": "bad-llm", "d.wav": "fine"}
+    records = run_corpus(tmp_path, contents, stt_batch=2)
+
+    errors = {r["file"]: r.get("error") for r in records}
+    assert errors == {
+        "a.wav": "cannot decode",
+        "b.wav": "stt failed",
+        "c.wav": "LLM error: refused",
+        "d.wav": None,
+    }
+    assert load_done_hashes(tmp_path / "results.jsonl") == {records[3]["sha256"]}
+
+
+def test_pipeline_batches_stt(tmp_path):
+    stt = FakeSTT()
+    run_corpus(tmp_path, {f"{i}.wav": f"take {i}" for i in range(5)}, stt=stt, stt_batch=2)
+    assert stt.batches == [2, 2, 1]
+
+
+def test_duplicates_and_finished_files_are_skipped(tmp_path):
+    contents = {"a.wav": "same", "b.wav": "same", "c.wav": "bad-llm"}
+    records = run_corpus(tmp_path, contents)
+    assert [r["file"] for r in records] == ["a.wav", "c.wav"]
+
+    # Only the failed file is retried
+    pending, skipped = find_pending(tmp_path / "corpus", tmp_path / "results.jsonl")
+    assert [path.name for path, _ in pending] == ["c.wav"]
+    assert skipped == 2
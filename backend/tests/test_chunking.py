@@ -0,0 +1,76 @@
+"""
+Tests for silence-based chunking
+"""
+import numpy as np
+
+from chunking import SAMPLE_RATE, split_on_silence, stitch_transcripts
+
+
+def _speech(seconds: float) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return (rng.standard_normal(int(seconds * SAMPLE_RATE)) * 0.1).astype(np.float32)
+
+
+def _silence(seconds: float) -> np.ndarray:
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+
+
+def test_short_audio_is_one_chunk():
+    audio = _speech(10)
+    assert split_on_silence(audio, chunk_s=30, overlap_s=1, min_silence_ms=300) == [(0, len(audio))]
+
+
+def test_cuts_inside_silence_without_overlap():
+    audio = np.concatenate([_speech(20), _silence(1), _speech(20)])
+    ranges = split_on_silence(audio, chunk_s=30, overlap_s=1, min_silence_ms=300)
+
+    assert len(ranges) == 2
+    cut = ranges[0][1]
+    assert 20 * SAMPLE_RATE <= cut <= 21 * SAMPLE_RATE
+    assert ranges[1] == (cut, len(audio))
+
+
+def test_chunks_cover_audio_within_max_length_plus_overlap():
+    audio = _speech(100)
+    ranges = split_on_silence(audio, chunk_s=30, overlap_s=1, min_silence_ms=300)
+
+    assert ranges[0][0] == 0
+    assert ranges[-1][1] == len(audio)
+    for (_, end), (start, _) in zip(ranges, ranges[1:]):
+        assert start < end  # Neighbours overlap
+    for start, end in ranges:
+        assert end - start <= 32 * SAMPLE_RATE
+
+
+def _ranges(*overlaps_s: float) -> list[tuple[int, int]]:
+    """10 second chunks sharing the given seconds of audio with their successor"""
+    ranges = [(0, 10 * SAMPLE_RATE)]
+    for overlap_s in overlaps_s:
+        start = ranges[-1][1] - int(overlap_s * SAMPLE_RATE)
+        ranges.append((start, start + 10 * SAMPLE_RATE))
+    return ranges
+
+
+def test_stitch_removes_overlapping_words():
+    texts = ["Hello there, how are", "how are you today.", "you today. I'm fine"]
+    assert stitch_transcripts(texts, _ranges(1, 1)) == "Hello there, how are you today. I'm fine"
+
+
+def test_stitch_keeps_repeated_words_without_overlap():
+    texts = ["I told him no.", "No, I said."]
+    assert stitch_transcripts(texts, _ranges(0)) == "I told him no. No, I said."
+
+
+def test_stitch_keeps_single_repeated_word():
+    assert stitch_transcripts(["We went there", "there was nobody"], _ranges(1)) == "We went there there was nobody"
+
+
+def test_stitch_drops_no_more_than_fits_in_overlap():
+    # Half a second holds at most two words, so the three-word match is speech
+    texts = ["we said it is fine", "it is fine again"]
+    assert stitch_transcripts(texts, _ranges(0.5)) == "we said it is fine it is fine again"
+
+
+def test_stitch_keeps_non_overlapping_text_and_skips_empty_chunks():
+    texts = ["I like tea.", "", "You like coffee."]
+    assert stitch_transcripts(texts, _ranges(1, 1)) == "I like tea. You like coffee."
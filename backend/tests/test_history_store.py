@@ -0,0 +1,73 @@
+"""
+Tests for learner history storage and progress aggregates
+"""
+import pytest
+
+from history_store import HistoryStore
+from models import FeedbackResponse, ScoreBreakdown, TimingsMs
+
+
+def make_feedback(score: int, transcript: str = "I go to school yesterday") -> FeedbackResponse:
+    return FeedbackResponse(
+        raw_transcript=transcript,
+        corrected="I went to school yesterday.",
+        issues=[],
+        better_options=[],
+        drill="I visited my friend yesterday.",
+        score=score,
+        score_breakdown=ScoreBreakdown(
+            vocabulary=score,
+            grammar=score,
+            understandability=score,
+            vocabulary_reason="",
+            grammar_reason="",
+            understandability_reason=""
+        ),
+        timings_ms=TimingsMs(stt=100, llm=200, total=300)
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    # A long flush interval shows that close() commits queued results
+    return HistoryStore(tmp_path / "history.db", batch_size=2, flush_interval_s=10.0, ewma_alpha=0.5)
+
+
+def test_history_pages_newest_first(store):
+    for i in range(5):
+        store.add("alice", make_feedback(60 + i, transcript=f"take {i}"), stt_model="base.en", llm_model="llama3.2:3b")
+    store.add("bob", make_feedback(90))
+    store.close()
+
+    reader = HistoryStore(store.path)
+    try:
+        first, cursor = reader.list_history("alice", limit=3)
+        second, last_cursor = reader.list_history("alice", limit=3, before_id=cursor)
+    finally:
+        reader.close()
+
+    transcripts = [entry["feedback"]["raw_transcript"] for entry in first + second]
+    assert transcripts == [f"take {i}" for i in range(4, -1, -1)]
+    assert first[0]["stt_model"] == "base.en"
+    assert first[0]["feedback"]["timings_ms"]["total"] == 300
+    assert last_cursor is None
+
+
+def test_progress_tracks_average_and_rolling_average(store):
+    for score in (40, 60, 80):
+        store.add("alice", make_feedback(score))
+    store.close()
+
+    reader = HistoryStore(store.path)
+    try:
+        progress = reader.get_progress("alice")
+        missing = reader.get_progress("bob")
+    finally:
+        reader.close()
+
+    assert progress["count"] == 3
+    assert progress["average"]["score"] == 60.0
+    # Seeded at 40, then halfway to 60 (50), then halfway to 80 (65)
+    assert progress["rolling_average"]["grammar"] == 65.0
+    assert progress["first_at"] <= progress["last_at"]
+    assert missing is None
@@ -0,0 +1,44 @@
+"""
+Tests for LLM feedback failure reporting
+"""
+import pytest
+
+from llm import LLMFeedbackError, LLMFeedbackGenerator
+
+
+class FakeClient:
+    def __init__(self, response=None, error=None):
+        self.response = response
+        self.error = error
+
+    def generate(self, model, prompt, **kwargs):
+        if self.error is not None:
+            raise self.error
+        return {"response": self.response}
+
+    def list(self):
+        return {"models": []}
+
+
+def make_generator(**client_kwargs) -> LLMFeedbackGenerator:
+    client = FakeClient(**client_kwargs)
+    return LLMFeedbackGenerator(health_interval_s=0, client_factory=lambda url, timeout: client)
+
+
+def test_llm_error_returns_placeholder_by_default():
+    generator = make_generator(error=ConnectionError("refused"))
+    feedback, _ = generator.generate_feedback("I go to school yesterday")
+    assert feedback.score == 50
+
+
+def test_llm_error_raises_in_strict_mode():
+    generator = make_generator(error=ConnectionError("refused"))
+    with pytest.raises(LLMFeedbackError) as info:
+        generator.generate_feedback("I go to school yesterday", strict=True)
+    assert info.value.fallback.score == 50
+
+
+def test_unparseable_response_raises_in_strict_mode():
+    generator = make_generator(response="not json")
+    with pytest.raises(LLMFeedbackError):
+        generator.generate_feedback("I go to school yesterday", strict=True)
@@ -0,0 +1,182 @@
+"""
+Tests for Ollama endpoint balancing, failover and circuit breaking
+"""
+import threading
+import time
+
+import ollama
+import pytest
+
+from ollama_pool import NoEndpointAvailable, OllamaPool
+
+
+class FakeClient:
+    """Stand-in for ollama.Client"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.models = ["llama3.2:3b"]
+        self.error = None
+        self.calls = 0
+        self.release = None  # Event that generate waits on, if set
+
+    def list(self):
+        if self.error is not None:
+            raise self.error
+        return {"models": [{"name": name} for name in self.models]}
+
+    def generate(self, model, prompt, **kwargs):
+        self.calls += 1
+        if self.release is not None:
+            self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return {"response": self.url}
+
+
+def make_pool(urls=("a", "b"), **kwargs):
+    clients = {url: FakeClient(url) for url in urls}
+    kwargs.setdefault("health_interval_s", 0)
+    pool = OllamaPool(list(urls), client_factory=lambda url, timeout: clients[url], **kwargs)
+    return pool, clients
+
+
+def circuit(pool, url):
+    return next(m["circuit"] for m in pool.metrics() if m["url"] == url)
+
+
+def test_routes_to_least_outstanding_endpoint():
+    pool, clients = make_pool()
+    clients["a"].release = threading.Event()
+
+    busy = threading.Thread(target=pool.generate, args=("llama3.2:3b", "x"))
+    busy.start()
+    while clients["a"].calls == 0:
+        time.sleep(0.001)
+
+    # "a" has one request in flight, so the next goes to "b"
+    assert pool.generate("llama3.2:3b", "x")["response"] == "b"
+
+    clients["a"].release.set()
+    busy.join()
+
+
+def test_fails_over_on_connection_error():
+    pool, clients = make_pool()
+    clients["a"].error = ConnectionError("refused")
+
+    assert pool.generate("llama3.2:3b", "x")["response"] == "b"
+    assert clients["a"].calls == 1
+
+
+def test_client_error_is_not_retried_and_does_not_open_circuit():
+    pool, clients = make_pool(failure_threshold=1)
+    clients["a"].error = ollama.ResponseError("model not found", 404)
+
+    with pytest.raises(ollama.ResponseError):
+        pool.generate("llama3.2:3b", "x")
+
+    assert clients["b"].calls == 0
+    assert circuit(pool, "a") == "closed"
+
+
+def test_server_error_fails_over():
+    pool, clients = make_pool()
+    clients["a"].error = ollama.ResponseError("internal error", 500)
+
+    assert pool.generate("llama3.2:3b", "x")["response"] == "b"
+
+
+def test_circuit_opens_then_half_opens_then_closes():
+    pool, clients = make_pool(failure_threshold=2, circuit_reset_s=0.05)
+    clients["a"].error = ConnectionError("refused")
+
+    pool.generate("llama3.2:3b", "x")
+    assert circuit(pool, "a") == "closed"
+    pool.generate("llama3.2:3b", "x")
+    assert circuit(pool, "a") == "open"
+
+    # While open, "a" is skipped entirely
+    calls = clients["a"].calls
+    assert pool.generate("llama3.2:3b", "x")["response"] == "b"
+    assert clients["a"].calls == calls
+
+    time.sleep(0.06)
+    assert circuit(pool, "a") == "half_open"
+
+    # A successful trial request closes the circuit
+    clients["a"].error = None
+    clients["b"].error = ConnectionError("refused")
+    assert pool.generate("llama3.2:3b", "x")["response"] == "a"
+    assert circuit(pool, "a") == "closed"
+
+
+def test_failed_half_open_trial_reopens_circuit():
+    pool, clients = make_pool(urls=("a",), failure_threshold=1, circuit_reset_s=0.05)
+    clients["a"].error = ConnectionError("refused")
+
+    with pytest.raises(ConnectionError):
+        pool.generate("llama3.2:3b", "x")
+    time.sleep(0.06)
+    with pytest.raises(ConnectionError):
+        pool.generate("llama3.2:3b", "x")
+
+    assert circuit(pool, "a") == "open"
+    with pytest.raises(NoEndpointAvailable):
+        pool.generate("llama3.2:3b", "x")
+
+
+def test_probe_marks_unhealthy_and_prefers_endpoints_with_model():
+    pool, clients = make_pool(urls=("a", "b", "c"))
+    clients["a"].error = ConnectionError("refused")
+    clients["b"].models = ["other"]
+
+    pool.probe()
+
+    healthy = {m["url"]: m["healthy"] for m in pool.metrics()}
+    assert healthy == {"a": False, "b": True, "c": True}
+    assert pool.generate("llama3.2:3b", "x")["response"] == "c"
+
+
+def test_probe_does_not_close_circuit():
+    pool, clients = make_pool(failure_threshold=1)
+    clients["a"].error = ollama.ResponseError("out of memory", 500)
+    pool.generate("llama3.2:3b", "x")
+    assert circuit(pool, "a") == "open"
+
+    # Listing models works again, but that does not mean generate does
+    clients["a"].error = None
+    pool.probe()
+    assert circuit(pool, "a") == "open"
+
+
+def test_unhealthy_endpoint_is_tried_when_no_healthy_one_remains():
+    pool, clients = make_pool(urls=("a",))
+    clients["a"].error = ConnectionError("refused")
+    pool.probe()
+    assert pool.metrics()[0]["healthy"] is False
+
+    # The server recovers before the next probe
+    clients["a"].error = None
+    assert pool.generate("llama3.2:3b", "x")["response"] == "a"
+    assert pool.metrics()[0]["healthy"] is True
+
+
+def test_records_latency_metrics():
+    pool, _ = make_pool(urls=("a",))
+    pool.generate("llama3.2:3b", "x")
+    pool.generate("llama3.2:3b", "x")
+
+    metrics = pool.metrics()[0]
+    assert metrics["requests"] == 2
+    assert metrics["errors"] == 0
+    assert metrics["avg_ms"] is not None
+    assert metrics["ewma_ms"] is not None
+
+
+def test_list_merges_models_across_endpoints():
+    pool, clients = make_pool()
+    clients["b"].models = ["mistral"]
+
+    names = [m["name"] for m in pool.list()["models"]]
+    assert names == ["llama3.2:3b", "mistral"]
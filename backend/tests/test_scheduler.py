@@ -0,0 +1,120 @@
+"""
+Tests for fair scheduling and rate limiting
+"""
+import asyncio
+from typing import Optional
+
+import pytest
+
+from scheduler import FairScheduler, RateLimited, RateLimiter, session_label
+
+
+async def _run_jobs(
+    scheduler: FairScheduler,
+    jobs: list[tuple[str, str]],
+    weights: Optional[dict[str, float]] = None
+) -> list[str]:
+    """Queue (session, lane) jobs while all slots are busy and return the order they ran in"""
+    order = []
+    weights = weights or {}
+
+    # Occupy every slot so all jobs are queued before any is dispatched
+    scheduler._running = scheduler.concurrency
+    tasks = [
+        asyncio.create_task(scheduler.run(
+            session, lane, order.append, f"{session}:{lane}", weight=weights.get(session, 1.0)
+        ))
+        for session, lane in jobs
+    ]
+    await asyncio.sleep(0)
+
+    for _ in range(scheduler.concurrency):
+        scheduler._release()
+    await asyncio.gather(*tasks)
+    return order
+
+
+def test_sessions_interleave_within_a_lane():
+    async def main():
+        scheduler = FairScheduler("test", concurrency=1)
+        jobs = [("bulk", "interactive")] * 4 + [("alice", "interactive")] * 2
+        order = await _run_jobs(scheduler, jobs)
+        return [tag.split(":")[0] for tag in order]
+
+    sessions = asyncio.run(main())
+    # alice is not stuck behind all of bulk's jobs
+    assert sessions == ["bulk", "alice", "bulk", "alice", "bulk", "bulk"]
+
+
+def test_higher_priority_lane_runs_first():
+    async def main():
+        scheduler = FairScheduler("test", concurrency=1)
+        jobs = [("a", "bulk"), ("b", "prompts"), ("c", "interactive")]
+        return await _run_jobs(scheduler, jobs)
+
+    order = asyncio.run(main())
+    lanes = [tag.split(":")[1] for tag in order]
+    assert lanes == ["interactive", "prompts", "bulk"]
+
+
+def test_weights_give_heavier_sessions_more_turns():
+    async def main():
+        scheduler = FairScheduler("test", concurrency=1)
+        jobs = [("vip", "interactive")] * 4 + [("std", "interactive")] * 2
+        order = await _run_jobs(scheduler, jobs, weights={"vip": 2.0})
+        return [tag.split(":")[0] for tag in order]
+
+    sessions = asyncio.run(main())
+    assert sessions[:4].count("vip") == 3
+
+
+def test_returns_result_and_reports_queue_state():
+    async def main():
+        scheduler = FairScheduler("test", concurrency=2)
+        result = await scheduler.run("s", "interactive", lambda x: x * 2, 21)
+        return result, scheduler.snapshot()
+
+    result, snapshot = asyncio.run(main())
+    assert result == 42
+    assert snapshot["running"] == 0
+    # Session IDs are only shown as opaque labels
+    assert snapshot["served"] == {session_label("s"): 1}
+    assert snapshot["lanes"]["interactive"]["queued"] == 0
+
+
+def test_stats_are_bounded():
+    async def main():
+        scheduler = FairScheduler("test", concurrency=1)
+        scheduler.MAX_SESSIONS = 3
+        for i in range(10):
+            await scheduler.run(f"s{i}", "interactive", lambda: None)
+        return scheduler.snapshot()
+
+    snapshot = asyncio.run(main())
+    assert list(snapshot["served"]) == [session_label(f"s{i}") for i in (7, 8, 9)]
+
+
+def test_unknown_lane_is_rejected():
+    async def main():
+        await FairScheduler("test").run("s", "vip", lambda: None)
+
+    with pytest.raises(ValueError):
+        asyncio.run(main())
+
+
+def test_rate_limiter_allows_burst_then_limits():
+    limiter = RateLimiter(requests_per_min=60, burst=2)
+    limiter.check("a")
+    limiter.check("a")
+    with pytest.raises(RateLimited):
+        limiter.check("a")
+
+    # Other sessions have their own bucket
+    limiter.check("b")
+    assert set(limiter.snapshot()["sessions"]) == {session_label("a"), session_label("b")}
+
+
+def test_rate_limiter_disabled_with_zero_rate():
+    limiter = RateLimiter(requests_per_min=0, burst=1)
+    for _ in range(5):
+        limiter.check("a")
@@ -0,0 +1,84 @@
+"""
+Tests for the int8 TorchScript encoder export
+"""
+import copy
+
+import pytest
+
+torch = pytest.importorskip("torch")
+whisper = pytest.importorskip("whisper")
+
+import whisper_export
+from whisper_export import _cache_path, _to_plain_linear, export_encoder, optimize_encoder
+
+
+def tiny_model() -> "whisper.model.Whisper":
+    """Randomly initialised Whisper small enough to export in a test"""
+    torch.manual_seed(0)
+    dims = whisper.model.ModelDimensions(
+        n_mels=80,
+        n_audio_ctx=1500,  # Fixed by the 30 second input window
+        n_audio_state=32,
+        n_audio_head=2,
+        n_audio_layer=2,
+        n_vocab=51865,
+        n_text_ctx=16,
+        n_text_state=32,
+        n_text_head=2,
+        n_text_layer=1
+    )
+    return whisper.model.Whisper(dims).eval()
+
+
+def whisper_linears(module) -> list:
+    return [m for m in module.modules() if isinstance(m, whisper.model.Linear)]
+
+
+def test_to_plain_linear_replaces_whisper_linears():
+    encoder = copy.deepcopy(tiny_model().encoder)
+    assert whisper_linears(encoder)
+
+    _to_plain_linear(encoder)
+
+    assert whisper_linears(encoder) == []
+    assert any(type(m) is torch.nn.Linear for m in encoder.modules())
+
+
+def test_export_matches_float_encoder_and_leaves_model_unchanged(tmp_path):
+    model = tiny_model()
+    # Only the encoder is exported; the decoder has uninitialised (possibly NaN) weights
+    before = {name: tensor.clone() for name, tensor in model.encoder.state_dict().items()}
+    linears = len(whisper_linears(model.encoder))
+    path = tmp_path / "encoder.pt"
+
+    export_encoder(model, path)
+
+    assert path.exists()
+    assert list(tmp_path.iterdir()) == [path]  # No temporary file left behind
+    assert len(whisper_linears(model.encoder)) == linears
+    after = model.encoder.state_dict()
+    assert all(torch.equal(before[name], after[name]) for name in before)
+
+    mel = torch.randn(1, 80, whisper.audio.N_FRAMES)
+    with torch.no_grad():
+        expected = model.encoder(mel)
+        actual = torch.jit.load(str(path))(mel)
+    assert actual.shape == expected.shape
+    assert (actual - expected).abs().max() < 0.1
+
+
+def test_optimize_encoder_reuses_cached_export(tmp_path, monkeypatch):
+    model = optimize_encoder(tiny_model(), "tiny-test", cache_dir=tmp_path)
+
+    path = _cache_path("tiny-test", tmp_path)
+    assert path.exists()
+    assert torch.__version__.split("+")[0] in path.name
+    assert _cache_path("/models/custom.pt", tmp_path).parent == tmp_path
+    assert isinstance(model.encoder, torch.jit.ScriptModule)
+
+    def fail_export(*args):
+        raise AssertionError("cache was not reused")
+
+    monkeypatch.setattr(whisper_export, "export_encoder", fail_export)
+    second = optimize_encoder(tiny_model(), "tiny-test", cache_dir=tmp_path)
+    assert isinstance(second.encoder, torch.jit.ScriptModule)
@@ -0,0 +1,114 @@
+"""
+Optimized Whisper encoder for CPU inference
+Dynamic int8 quantization + TorchScript export, cached on disk
+"""
+import copy
+import os
+import tempfile
+from pathlib import Path
+
+import torch
+import whisper
+from torch import nn
+
+
+CPU_BACKENDS = ("torch", "torchscript_int8")
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "english-train" / "whisper"
+
+
+def configure_threads(intra_op: int = 0, inter_op: int = 0):
+    """
+    Set PyTorch CPU thread pools
+
+    Args:
+        intra_op: Threads used inside an op (0 keeps the PyTorch default)
+        inter_op: Threads used across independent ops (0 keeps the PyTorch default)
+    """
+    if intra_op > 0:
+        torch.set_num_threads(intra_op)
+    if inter_op > 0:
+        try:
+            torch.set_num_interop_threads(inter_op)
+        except RuntimeError as e:
+            # Can only be set once, before any parallel work has started
+            print(f"Warning: Could not set inter-op threads: {e}")
+
+
+def _to_plain_linear(module: nn.Module):
+    """
+    Replace Whisper's Linear subclass with nn.Linear
+
+    quantize_dynamic only swaps modules whose type is exactly nn.Linear.
+    """
+    for name, child in module.named_children():
+        if isinstance(child, nn.Linear) and type(child) is not nn.Linear:
+            plain = nn.Linear(child.in_features, child.out_features, bias=child.bias is not None)
+            plain.load_state_dict(child.state_dict())
+            setattr(module, name, plain)
+        else:
+            _to_plain_linear(child)
+
+
+def _cache_path(model_name: str, cache_dir: Path) -> Path:
+    # TorchScript archives are not guaranteed portable across torch versions
+    torch_version = torch.__version__.split("+")[0]
+    # Model names may be checkpoint paths; keep the export inside cache_dir
+    return cache_dir / f"{Path(model_name).name}-encoder-int8-torch{torch_version}.pt"
+
+
+def export_encoder(model: whisper.model.Whisper, path: Path):
+    """
+    Quantize the encoder's linear layers to int8 and save it as TorchScript
+
+    Args:
+        model: Whisper model on CPU in float32 (left unchanged)
+        path: Output file
+    """
+    # Work on a copy so a failed export leaves the model usable
+    encoder = copy.deepcopy(model.encoder)
+    encoder.eval()
+    _to_plain_linear(encoder)
+    quantized = torch.ao.quantization.quantize_dynamic(encoder, {nn.Linear}, dtype=torch.qint8)
+
+    # Whisper always pads audio to a 30 second window, so the input shape is fixed
+    example = torch.zeros(1, model.dims.n_mels, whisper.audio.N_FRAMES)
+    with torch.no_grad():
+        traced = torch.jit.trace(quantized, example)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Write atomically so a crash never leaves a partial cache file
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    os.close(fd)
+    try:
+        torch.jit.save(traced, tmp_name)
+        os.replace(tmp_name, path)
+    finally:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+
+
+def optimize_encoder(
+    model: whisper.model.Whisper,
+    model_name: str,
+    cache_dir: Path = DEFAULT_CACHE_DIR
+) -> whisper.model.Whisper:
+    """
+    Swap the model's encoder for a cached int8 TorchScript export
+
+    The export is created on first use and reused afterwards.
+
+    Args:
+        model: Whisper model on CPU in float32
+        model_name: Whisper model name (cache key)
+        cache_dir: Directory for exported encoders
+
+    Returns:
+        The same model with its encoder replaced
+    """
+    path = _cache_path(model_name, Path(cache_dir))
+    if not path.exists():
+        print(f"Exporting int8 Whisper encoder to {path}")
+        export_encoder(model, path)
+
+    model.encoder = torch.jit.load(str(path), map_location="cpu")
+    return model
@@ -0,0 +1,29 @@
+const SESSION_KEY = "english-train-session-id";
+
+/**
+ * Get a stable per-browser session ID used by the backend for fair scheduling and history
+ */
+export function getSessionId(): string {
+  if (typeof window === "undefined") {
+    return "";
+  }
+
+  try {
+    let sessionId = localStorage.getItem(SESSION_KEY);
+    if (!sessionId) {
+      sessionId = crypto.randomUUID();
+      localStorage.setItem(SESSION_KEY, sessionId);
+    }
+    return sessionId;
+  } catch {
+    return "";
+  }
+}
+
+/**
+ * Headers that forward the browser's session ID to the backend, if it sent one
+ */
+export function sessionHeaders(request: Request): Record<string, string> {
+  const sessionId = request.headers.get("x-session-id");
+  return sessionId ? { "X-Session-ID": sessionId } : {};
+}
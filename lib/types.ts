@@ -25,6 +25,11 @@ export type Feedback = {
     stt?: number;
     llm?: number;
     total?: number;
+    stt_chunks?: {
+      start_s: number;
+      end_s: number;
+      stt: number;
+    }[];
   };
 };
 